@@ -0,0 +1,79 @@
+"""
+Compare the old requests_html table extraction with the
+streaming `table_parser.iter_table` on the checked-in pages.
+
+python bench_parse.py [iterations]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from requests_html import HTML
+
+from table_parser import iter_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = ["world.html", "world-2020.html"]
+
+
+def requests_html_extract(html_text):
+    # the extraction `parse_and_extract` used before table_parser
+    r_html = HTML(html=html_text)
+    r_table = r_html.find(".imdb-scroll-table")
+    if len(r_table) == 0:
+        return None
+    rows = r_table[0].find("tr")
+    header_names = [x.text for x in rows[0].find('th')]
+    table_data = []
+    for row in rows[1:]:
+        table_data.append([col.text for col in row.find("td")])
+    return header_names, table_data
+
+
+def streaming_extract(html_text):
+    rows = iter_table(html_text)
+    header_names = next(rows, None)
+    if header_names == None:
+        return None
+    return header_names, list(rows)
+
+
+PARSERS = {
+    "requests_html": requests_html_extract,
+    "streaming": streaming_extract,
+}
+
+
+def measure(parser, html_text, iterations=20):
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        header_names, table_data = parser(html_text)
+    run_time = time.perf_counter() - start_time
+    rows_per_second = (len(table_data) * iterations) / run_time
+
+    tracemalloc.start()
+    parser(html_text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows_per_second, peak
+
+
+def run(iterations=20):
+    for filename in FIXTURES:
+        with open(os.path.join(BASE_DIR, filename), 'r') as f:
+            html_text = f.read()
+        expected = requests_html_extract(html_text)
+        actual = streaming_extract(html_text)
+        assert expected == actual, f"{filename}: streaming rows differ from requests_html"
+        print(f"{filename} ({len(expected[1])} rows)")
+        for name, parser in PARSERS.items():
+            rows_per_second, peak = measure(parser, html_text, iterations=iterations)
+            print(f"\t{name:<15}{rows_per_second:>12,.0f} rows/s{peak / 1024:>10,.0f} KiB peak")
+
+
+if __name__ == "__main__":
+    try:
+        iterations = int(sys.argv[1])
+    except:
+        iterations = 20
+    run(iterations=iterations)
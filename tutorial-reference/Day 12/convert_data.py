@@ -0,0 +1,33 @@
+"""
+Convert already-scraped data/{year}.csv files (string columns)
+to typed parquet / feather files next to them.
+
+python convert_data.py [data_dir] [--feather]
+python convert_data.py "../Day 17/data"
+"""
+import os
+import sys
+import pandas as pd
+
+from typed_columns import coerce_types, write_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def convert_dir(data_dir, fmt="parquet"):
+    csv_files = sorted(x for x in os.listdir(data_dir) if x.endswith(".csv"))
+    for filename in csv_files:
+        csv_path = os.path.join(data_dir, filename)
+        # keep everything as text so "$1,234" is parsed by coerce_types
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        df = coerce_types(df)
+        filepath_root = os.path.join(data_dir, filename.replace(".csv", ""))
+        filepath = write_table(df, filepath_root, fmt=fmt)
+        print(f"{filename} -> {os.path.basename(filepath)}")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    fmt = "feather" if "--feather" in sys.argv else "parquet"
+    data_dir = args[0] if len(args) > 0 else os.path.join(BASE_DIR, "data")
+    convert_dir(data_dir, fmt=fmt)
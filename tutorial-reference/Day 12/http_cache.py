@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+
+
+class HTTPCache:
+    """
+    On-disk response cache keyed by URL.
+
+    Stores the body with its ETag / Last-Modified headers so repeat
+    requests can be made conditional (If-None-Match / If-Modified-Since)
+    and a 304 reuses the stored body.
+
+    Entries younger than `ttl` seconds are served without a request.
+    The cache is bounded to `max_size` bytes of bodies and evicts the
+    least recently used entries first.
+    """
+    def __init__(self, cache_dir, ttl=60 * 60 * 24, max_size=100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self.load_index()
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except ValueError:
+            # corrupt index, start over
+            return {}
+
+    def save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def body_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def read_body(self, url):
+        entry = self.index.get(url)
+        if entry == None:
+            return None
+        path = self.body_path(url)
+        if not os.path.exists(path):
+            # body went missing, forget the entry
+            self.index.pop(url, None)
+            self.save_index()
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            body = f.read()
+        entry['last_access'] = time.time()
+        self.save_index()
+        return body
+
+    def fresh_body(self, url, ttl=None):
+        """
+        Body for `url` if it was fetched or revalidated less
+        than `ttl` seconds ago, otherwise None.
+        """
+        if ttl == None:
+            ttl = self.ttl
+        entry = self.index.get(url)
+        if entry == None:
+            return None
+        if time.time() - entry['fetched_at'] > ttl:
+            return None
+        return self.read_body(url)
+
+    def conditional_headers(self, url):
+        entry = self.index.get(url)
+        headers = {}
+        if entry == None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidate(self, url):
+        """
+        The origin answered 304: the stored body is still good.
+        """
+        entry = self.index.get(url)
+        if entry == None:
+            return None
+        entry['fetched_at'] = time.time()
+        return self.read_body(url)
+
+    def store(self, url, body, headers=None):
+        headers = headers or {}
+        path = self.body_path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        now = time.time()
+        self.index[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": now,
+            "last_access": now,
+            "size": os.path.getsize(path),
+        }
+        self.evict()
+        self.save_index()
+
+    def evict(self):
+        total_size = sum(entry['size'] for entry in self.index.values())
+        by_last_access = sorted(self.index.items(), key=lambda item: item[1]['last_access'])
+        for url, entry in by_last_access:
+            if total_size <= self.max_size:
+                break
+            path = self.body_path(url)
+            if os.path.exists(path):
+                os.remove(path)
+            total_size -= entry['size']
+            del self.index[url]
@@ -1,76 +1,178 @@
 import os
 import sys
+import time
+import asyncio
 import datetime
 import requests
+from aiohttp import ClientSession
 import pandas as pd
-from requests_html import HTML
+
+from http_cache import HTTPCache
+from manifest import Manifest, content_hash
+from table_parser import iter_table
+from typed_columns import coerce_types, write_table
 
 BASE_DIR = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'http')
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+http_cache = HTTPCache(CACHE_DIR)
+manifest = Manifest(os.path.join(DATA_DIR, 'manifest.json'))
 
 
 
-def url_to_txt(url, filename="world.html", save=False):
-    r = requests.get(url)
-    if r.status_code == 200:
-        html_text = r.text
-        if save:
-            with open(f"world-{year}.html", 'w') as f:
-                f.write(html_text)
-        return html_text
-    return None
+def url_to_txt(url, filename="world.html", save=False, use_cache=True):
+    html_text = None
+    if use_cache:
+        html_text = http_cache.fresh_body(url)
+    if html_text == None:
+        headers = http_cache.conditional_headers(url) if use_cache else {}
+        r = requests.get(url, headers=headers)
+        if r.status_code == 304:
+            html_text = http_cache.revalidate(url)
+            if html_text == None:
+                # cached body is gone, fetch it again in full
+                return url_to_txt(url, filename=filename, save=save, use_cache=False)
+        elif r.status_code == 200:
+            html_text = r.text
+            if use_cache:
+                http_cache.store(url, html_text, r.headers)
+    if html_text != None and save:
+        with open(filename, 'w') as f:
+            f.write(html_text)
+    return html_text
+
 
+def extract_table(html_text):
+    rows = iter_table(html_text, table_class="imdb-scroll-table")
+    header_names = next(rows, None)
+    if header_names == None:
+        return None
+    table_data = list(rows)
+    return header_names, table_data
+
+
+def save_table(header_names, table_data, name='2020', fmt='csv'):
+    """
+    fmt: "csv", "parquet" or "feather"
+    csv keeps the scraped strings and column names ("$1,234", "%"),
+    the layout the Day 17 cleanup notebook reads. parquet and feather
+    get the typed schema from typed_columns.coerce_types().
+    """
+    df = pd.DataFrame(table_data, columns=header_names)
+    if fmt != "csv":
+        df = coerce_types(df)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    filepath_root = os.path.join(DATA_DIR, f'{name}')
+    return write_table(df, filepath_root, fmt=fmt)
 
 
-def parse_and_extract(url, name='2020'):
+def extract_and_save(html_text, name='2020', fmt='csv', url=None, force=False):
+    digest = content_hash(html_text)
+    if not force and manifest.is_unchanged(name, url, digest, fmt=fmt):
+        print(f"{name} unchanged, skipped")
+        return True
+    table = extract_table(html_text)
+    if table == None:
+        return False
+    header_names, table_data = table
+    filepath = save_table(header_names, table_data, name=name, fmt=fmt)
+    manifest.record(name, url, digest, len(table_data), filepath)
+    return True
+
+
+def parse_and_extract(url, name='2020', fmt='csv', force=False):
     html_text = url_to_txt(url)
     if html_text == None:
         return False
-    r_html = HTML(html=html_text)
-    table_class = ".imdb-scroll-table"
-    # table_class = "#table"
-    r_table = r_html.find(table_class)
-
-    # print(r_table)
-    table_data = []
-    # table_data_dicts = []
-    header_names = []
-    if len(r_table) == 0:
-        return False
-    parsed_table = r_table[0]
-    rows = parsed_table.find("tr")
-    header_row = rows[0]
-    header_cols = header_row.find('th')
-    header_names = [x.text for x in header_cols]
-    for row in rows[1:]:
-        # print(row.text)
-        cols = row.find("td")
-        row_data = []
-        row_dict_data = {}
-        for i, col in enumerate(cols):
-            # print(i, col.text, '\n\n')
-            header_name = header_names[i]
-            # row_dict_data[header_name] = col.text
-            row_data.append(col.text)
-        table_data_dicts.append(row_dict_data)
-        table_data.append(row_data)
-    df = pd.DataFrame(table_data, columns=header_names)
-    # df = pd.DataFrame(table_data_dicts)
-    path = os.path.join(BASE_DIR, 'data')
-    os.makedirs(path, exist_ok=True)
-    filepath = os.path.join('data', f'{name}.csv')
-    df.to_csv(filepath, index=False)
-    return True
+    return extract_and_save(html_text, name=name, fmt=fmt, url=url, force=force)
+
+
+async def fetch(url, session, year=None, use_cache=True):
+    start_time = time.time()
+    html_body = None
+    if use_cache:
+        html_body = http_cache.fresh_body(url)
+    if html_body != None:
+        return {"body": html_body, "year": year, "latency": time.time() - start_time}
+    headers = http_cache.conditional_headers(url) if use_cache else {}
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            html_body = http_cache.revalidate(url)
+            if html_body == None:
+                return await fetch(url, session, year=year, use_cache=False)
+        elif response.status == 200:
+            html_body = await response.text()
+            if use_cache:
+                http_cache.store(url, html_body, response.headers)
+        return {"body": html_body, "year": year, "latency": time.time() - start_time}
+
+
+async def fetch_with_sem(sem, session, url, year=None):
+    async with sem:
+        return await fetch(url, session, year)
+
+
+async def fetch_and_extract(sem, session, url, year, fmt='csv', force=False):
+    result = await fetch_with_sem(sem, session, url, year=year)
+    finished = False
+    if result['body'] != None:
+        finished = extract_and_save(result['body'], name=year, fmt=fmt, url=url, force=force)
+    result['finished'] = finished
+    return result
 
-def run(start_year=None, years_ago=0):
+
+async def async_run(years, concurrency=10, fmt='csv', force=False):
+    """
+    Fetch every year concurrently (at most `concurrency`
+    requests in flight) and write data/{year}.{fmt} as each
+    page arrives.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    start_time = time.time()
+    tasks = []
+    async with ClientSession() as session:
+        for year in years:
+            url = f"https://www.boxofficemojo.com/year/world/{year}/"
+            tasks.append(
+                asyncio.create_task(
+                    fetch_and_extract(sem, session, url, year, fmt=fmt, force=force)
+                )
+            )
+        results = []
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            year = result['year']
+            latency = result['latency']
+            if result['finished']:
+                print(f"Finished {year} in {latency:.2f}s")
+            else:
+                print(f"{year} not finished ({latency:.2f}s)")
+            results.append(result)
+    run_time = time.time() - start_time
+    pages_per_second = len(results) / run_time if run_time > 0 else 0
+    print(f"Fetched {len(results)} pages in {run_time:.2f}s ({pages_per_second:.2f} pages/s)")
+    return results
+
+
+def run(start_year=None, years_ago=0, concurrency=None, fmt='csv', force=False):
+    """
+    Years whose page hasn't changed since the last run
+    (see manifest.py) are skipped unless force=True.
+    """
     if start_year == None:
         now = datetime.datetime.now()
         start_year = now.year
     assert isinstance(start_year, int)
     assert isinstance(years_ago, int)
     assert len(f"{start_year}") == 4
+    if concurrency != None:
+        assert isinstance(concurrency, int) and concurrency > 0
+        years = [start_year - i for i in range(0, years_ago+1)]
+        return asyncio.run(async_run(years, concurrency=concurrency, fmt=fmt, force=force))
     for i in range(0, years_ago+1):
         url = f"https://www.boxofficemojo.com/year/world/{start_year}/"
-        finished = parse_and_extract(url, name=start_year)
+        finished = parse_and_extract(url, name=start_year, fmt=fmt, force=force)
         if finished:
             print(f"Finished {start_year}")
         else:
@@ -78,14 +180,25 @@ def run(start_year=None, years_ago=0):
         start_year -= 1
 
 
-
 if __name__ == "__main__":
+    # python scrape.py [start_year] [years_ago] [concurrency] [--parquet|--feather] [--force]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    fmt = 'csv'
+    if "--parquet" in sys.argv:
+        fmt = 'parquet'
+    elif "--feather" in sys.argv:
+        fmt = 'feather'
+    force = "--force" in sys.argv
     try:
-        start = int(sys.argv[1])
+        start = int(args[0])
     except:
         start = None
     try:
-        count = int(sys.argv[2])
+        count = int(args[1])
     except:
         count = 0
-    run(start_year=start, years_ago=count)
\ No newline at end of file
+    try:
+        concurrency = int(args[2])
+    except:
+        concurrency = None
+    run(start_year=start, years_ago=count, concurrency=concurrency, fmt=fmt, force=force)
\ No newline at end of file
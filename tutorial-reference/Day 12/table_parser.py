@@ -0,0 +1,87 @@
+from html.parser import HTMLParser
+
+
+class ScrollTableParser(HTMLParser):
+    """
+    Pulls the rows out of the first element with `table_class`
+    (boxofficemojo wraps its tables in `.imdb-scroll-table`)
+    without building a DOM.
+
+    The first row keeps its <th> cells (the header names),
+    every other row keeps its <td> cells, which is what
+    `parse_and_extract` did with requests_html.
+    """
+    def __init__(self, table_class="imdb-scroll-table"):
+        super().__init__(convert_charrefs=True)
+        self.table_class = table_class
+        self.container_tag = None
+        self.depth = 0
+        self.done = False
+        self.row = None
+        self.row_count = 0
+        self.cell_text = None
+        self.rows = [] # finished rows waiting to be handed out
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.container_tag == None:
+            classes = (dict(attrs).get("class") or "").split()
+            if self.table_class in classes:
+                self.container_tag = tag
+                self.depth = 1
+            return
+        if tag == self.container_tag:
+            self.depth += 1
+        elif tag == "tr":
+            self.end_row()
+            self.row = []
+        elif self.row != None:
+            cell_tag = "th" if self.row_count == 0 else "td"
+            if tag == cell_tag:
+                self.cell_text = []
+
+    def handle_endtag(self, tag):
+        if self.done or self.container_tag == None:
+            return
+        if tag == self.container_tag:
+            self.depth -= 1
+            if self.depth == 0:
+                self.end_row()
+                self.done = True
+        elif tag == "tr":
+            self.end_row()
+        elif tag in ("td", "th") and self.cell_text != None:
+            self.row.append(" ".join("".join(self.cell_text).split()))
+            self.cell_text = None
+
+    def handle_data(self, data):
+        if self.cell_text != None:
+            self.cell_text.append(data)
+
+    def end_row(self):
+        if self.row == None:
+            return
+        self.rows.append(self.row)
+        self.row = None
+        self.row_count += 1
+        self.cell_text = None
+
+
+def iter_table(html_text, table_class="imdb-scroll-table", chunk_size=64 * 1024):
+    """
+    Yield the header names, then each row (a list of cell
+    strings), in one pass over `html_text`.
+    Stops reading as soon as the table is closed.
+    """
+    parser = ScrollTableParser(table_class=table_class)
+    for i in range(0, len(html_text), chunk_size):
+        parser.feed(html_text[i:i + chunk_size])
+        yield from parser.rows
+        parser.rows = []
+        if parser.done:
+            break
+    else:
+        parser.close()
+        parser.end_row()
+        yield from parser.rows
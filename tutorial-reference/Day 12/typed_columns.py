@@ -0,0 +1,82 @@
+import re
+import pandas as pd
+
+CURRENCY_PATTERN = re.compile(r"^\$[\d,]+$")
+PERCENT_PATTERN = re.compile(r"^<?[\d.]+%$")
+MISSING_VALUES = ("-", "")
+
+
+def currency_to_int(series):
+    """
+    "$1,234" -> 1234, "-" -> <NA>
+    """
+    cleaned = series.astype("string").str.replace(r"[$,]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype("Int64")
+
+
+def percent_to_float(series):
+    """
+    "48.5%" -> 0.485, "<0.1%" -> 0.001, "-" -> NaN
+    """
+    cleaned = series.astype("string").str.replace(r"[<%]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64") / 100
+
+
+def matches(series, pattern):
+    values = series.dropna().astype(str)
+    values = values[~values.isin(MISSING_VALUES)]
+    if len(values) == 0:
+        return False
+    return bool(values.map(lambda value: pattern.match(value) != None).all())
+
+
+def column_names(columns):
+    """
+    boxofficemojo labels both share columns "%" (read back
+    from csv as "%" and "%.1"); name them after the column
+    they follow: "Domestic %", "Foreign %".
+    """
+    names = []
+    for i, column in enumerate(columns):
+        column = str(column)
+        if column.startswith("%") and i > 0:
+            column = f"{names[i - 1]} %"
+        names.append(column)
+    return names
+
+
+def coerce_types(df):
+    """
+    Convert the scraped string columns to numeric dtypes:
+    Rank -> int, currency -> Int64 (nullable), percent -> float fraction.
+    """
+    df = df.copy()
+    df.columns = column_names(df.columns)
+    for column in df.columns:
+        series = df[column]
+        if column == "Rank":
+            df[column] = pd.to_numeric(series, errors="coerce").astype("Int64")
+        elif matches(series, CURRENCY_PATTERN):
+            df[column] = currency_to_int(series)
+        elif matches(series, PERCENT_PATTERN):
+            df[column] = percent_to_float(series)
+    return df
+
+
+def write_table(df, filepath_root, fmt="csv"):
+    """
+    Write `df` as csv, parquet or feather; returns the path.
+    parquet / feather need pyarrow installed.
+    """
+    if fmt == "csv":
+        filepath = f"{filepath_root}.csv"
+        df.to_csv(filepath, index=False)
+    elif fmt == "parquet":
+        filepath = f"{filepath_root}.parquet"
+        df.to_parquet(filepath, index=False)
+    elif fmt == "feather":
+        filepath = f"{filepath_root}.feather"
+        df.reset_index(drop=True).to_feather(filepath)
+    else:
+        raise ValueError(f"Unknown output format {fmt}")
+    return filepath
@@ -0,0 +1,81 @@
+import uuid
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Runs functions on a bounded local thread pool so a web
+    request can enqueue work and return right away.
+
+    - submit() returns the job (a dict with an "id") immediately
+    - an identical call (same function + arguments) that is
+      still queued or running is not started twice, the
+      existing job is returned instead
+    - at most `max_pending` jobs can be queued or running
+
+    Jobs only live in this process's memory, so run the server
+    with a single worker process (gunicorn's default).
+    """
+    def __init__(self, max_workers=1, max_pending=10, max_finished=100):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+        self.jobs = {} # job id -> job
+        self.active = {} # (func, args) -> job id of the queued / running job
+        self.finished = [] # job ids, oldest first
+
+    def submit(self, func, *args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        with self.lock:
+            if key in self.active:
+                return dict(self.jobs[self.active[key]])
+            if len(self.active) >= self.max_pending:
+                raise QueueFull(f"{len(self.active)} jobs already queued")
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "created": datetime.datetime.now().isoformat(),
+                "started": None,
+                "finished": None,
+                "result": None,
+                "error": None,
+            }
+            self.jobs[job_id] = job
+            self.active[key] = job_id
+        self.executor.submit(self.run_job, job_id, key, func, args, kwargs)
+        return dict(job)
+
+    def run_job(self, job_id, key, func, args, kwargs):
+        job = self.jobs[job_id]
+        with self.lock:
+            job['status'] = "running"
+            job['started'] = datetime.datetime.now().isoformat()
+        try:
+            result = func(*args, **kwargs)
+            status, error = "finished", None
+        except Exception as e:
+            result, status, error = None, "failed", repr(e)
+        with self.lock:
+            job['result'] = result
+            job['error'] = error
+            job['status'] = status
+            job['finished'] = datetime.datetime.now().isoformat()
+            self.active.pop(key, None)
+            self.finished.append(job_id)
+            while len(self.finished) > self.max_finished:
+                self.jobs.pop(self.finished.pop(0), None)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job == None:
+                return None
+            return dict(job)
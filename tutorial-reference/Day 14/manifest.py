@@ -0,0 +1,58 @@
+import os
+import json
+import hashlib
+import datetime
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """
+    Records, per year, the source url, the sha256 of the page,
+    the number of rows extracted and where they were written.
+
+    A year whose page hashes the same as last time (and whose
+    output is still on disk) doesn't need to be parsed or written again.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.base_dir = os.path.dirname(path)
+        self.entries = self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def save(self):
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_unchanged(self, name, url, digest, fmt='csv'):
+        entry = self.entries.get(f"{name}")
+        if entry == None:
+            return False
+        if entry['url'] != url or entry['hash'] != digest:
+            return False
+        if not entry['path'].endswith(f".{fmt}"):
+            return False
+        return os.path.exists(os.path.join(self.base_dir, entry['path']))
+
+    def record(self, name, url, digest, row_count, filepath):
+        self.entries[f"{name}"] = {
+            "url": url,
+            "hash": digest,
+            "rows": row_count,
+            "path": os.path.relpath(filepath, self.base_dir),
+            "updated": datetime.datetime.now().isoformat(),
+        }
+        self.save()
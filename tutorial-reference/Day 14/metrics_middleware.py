@@ -0,0 +1,336 @@
+"""
+Request metrics for the Flask and FastAPI apps, as WSGI and ASGI
+middleware sharing one Metrics store, served in the Prometheus text
+format on /metrics.
+
+Flask:   app.wsgi_app = MetricsMiddleware(app.wsgi_app, url_map=app.url_map)
+FastAPI: app.add_middleware(ASGIMetricsMiddleware)
+
+Add it last (outermost) so the time spent in the other middleware
+(e.g. gzip) is counted too.
+
+- http_request_duration_seconds: latency histogram per route
+- http_response_size_bytes: body size histogram per route
+- http_requests_total: per route and status
+- http_request_errors_total: 5xx responses and unhandled exceptions
+- http_requests_in_flight: per method (the route of an ASGI request
+  is only known once the router has matched it)
+
+Routes are the route templates ("/box-office-mojo-scraper/<job_id>"),
+never the raw path, so a label can't explode into one per id.
+
+profile=True starts a sampling profiler: a thread that records the
+stacks of in-flight requests every `profile_interval` seconds and keeps
+the `profile_slowest` slowest requests, dumped on /metrics/slowest
+(collapsed stacks, the input format of flamegraph.pl / speedscope).
+
+The same file is in Day 14/, Day 17/server/ and Day_28/src/cfe_os/,
+each day's code runs on its own (Day 28 is frozen with pyinstaller),
+keep the copies identical.
+"""
+import sys
+import time
+import heapq
+import itertools
+import threading
+from collections import Counter
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+METRICS_PATH = "/metrics"
+SLOWEST_PATH = "/metrics/slowest"
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def collapse(frame):
+    """
+    A frame's stack as "file:function:line;..." from the outermost call.
+    """
+    stack = []
+    while frame != None:
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class Request:
+    def __init__(self, method, path, thread_id=None):
+        self.method = method
+        self.path = path
+        self.route = UNMATCHED_ROUTE
+        self.thread_id = thread_id
+        self.start_time = time.perf_counter()
+        self.samples = Counter()
+
+
+class Metrics:
+    """
+    All counters behind one lock, updates are a few dict lookups.
+    """
+    def __init__(self, profile=False, profile_interval=0.005, profile_slowest=10):
+        self.lock = threading.Lock()
+        self.durations = {} # (method, route) -> Histogram
+        self.sizes = {} # (method, route) -> Histogram
+        self.statuses = Counter() # (method, route, status) -> count
+        self.errors = Counter() # (method, route) -> count
+        self.in_flight = Counter() # method -> count
+        self.active = {} # id -> Request, only when profiling
+        self.slowest = [] # min heap of (duration, seq, Request)
+        self.sequence = itertools.count()
+        self.profile_slowest = profile_slowest
+        self.profile_interval = profile_interval
+        self.profiling = profile
+        if profile:
+            threading.Thread(target=self.sample_stacks, daemon=True).start()
+
+    def start(self, method, path, thread_id=None):
+        request = Request(method, path, thread_id=thread_id)
+        with self.lock:
+            self.in_flight[method] += 1
+            if self.profiling:
+                self.active[id(request)] = request
+        return request
+
+    def finish(self, request, status, size, error=False):
+        duration = time.perf_counter() - request.start_time
+        key = (request.method, request.route)
+        with self.lock:
+            self.in_flight[request.method] -= 1
+            histogram = self.durations.get(key)
+            if histogram == None:
+                histogram = self.durations[key] = Histogram(DURATION_BUCKETS)
+                self.sizes[key] = Histogram(SIZE_BUCKETS)
+            histogram.observe(duration)
+            self.sizes[key].observe(size)
+            self.statuses[key + (status,)] += 1
+            if error or status >= 500:
+                self.errors[key] += 1
+            if self.profiling:
+                self.active.pop(id(request), None)
+                self.keep_if_slow(duration, request)
+
+    def keep_if_slow(self, duration, request):
+        entry = (duration, next(self.sequence), request)
+        if len(self.slowest) < self.profile_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def sample_stacks(self):
+        """
+        WSGI requests are sampled on their own thread. An ASGI request
+        doesn't own a thread (the event loop or the threadpool runs it),
+        so it gets the stacks of every other thread while it is in flight
+        (idle threadpool workers show up as waiting in threading.py).
+        """
+        sampler_id = threading.get_ident()
+        while True:
+            time.sleep(self.profile_interval)
+            with self.lock:
+                requests = list(self.active.values())
+            if not requests:
+                continue
+            frames = sys._current_frames()
+            stacks = {
+                thread_id: collapse(frame)
+                for thread_id, frame in frames.items() if thread_id != sampler_id
+            }
+            for request in requests:
+                if request.thread_id != None:
+                    stack = stacks.get(request.thread_id)
+                    if stack != None:
+                        request.samples[stack] += 1
+                else:
+                    for stack in stacks.values():
+                        request.samples[stack] += 1
+
+    def render(self):
+        lines = []
+        with self.lock:
+            lines.append("# HELP http_request_duration_seconds Request latency, until the last body byte.")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self.durations.items()):
+                lines.extend(histogram.lines("http_request_duration_seconds", f'method="{method}",route="{escape(route)}"'))
+            lines.append("# HELP http_response_size_bytes Response body size.")
+            lines.append("# TYPE http_response_size_bytes histogram")
+            for (method, route), histogram in sorted(self.sizes.items()):
+                lines.extend(histogram.lines("http_response_size_bytes", f'method="{method}",route="{escape(route)}"'))
+            lines.append("# HELP http_requests_total Finished requests.")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), count in sorted(self.statuses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{escape(route)}",status="{status}"}} {count}')
+            lines.append("# HELP http_request_errors_total 5xx responses and unhandled exceptions.")
+            lines.append("# TYPE http_request_errors_total counter")
+            for (method, route), count in sorted(self.errors.items()):
+                lines.append(f'http_request_errors_total{{method="{method}",route="{escape(route)}"}} {count}')
+            lines.append("# HELP http_requests_in_flight Requests being handled.")
+            lines.append("# TYPE http_requests_in_flight gauge")
+            for method, count in sorted(self.in_flight.items()):
+                lines.append(f'http_requests_in_flight{{method="{method}"}} {count}')
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def render_slowest(self):
+        if not self.profiling:
+            return b"profiling is off, start the middleware with profile=True\n"
+        with self.lock:
+            slowest = sorted(self.slowest, reverse=True)
+        lines = []
+        for duration, _, request in slowest:
+            lines.append(f"# {duration * 1000:.1f} ms {request.method} {request.path} ({request.route})")
+            for stack, count in request.samples.most_common():
+                lines.append(f"{stack} {count}")
+            lines.append("")
+        return "\n".join(lines).encode("utf-8")
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsMiddleware:
+    """
+    WSGI: app.wsgi_app = MetricsMiddleware(app.wsgi_app, url_map=app.url_map)
+
+    The route is the url_map rule matching the request (Flask's
+    own routing table), the view itself still does its own matching.
+    """
+    def __init__(self, app, url_map=None, **options):
+        self.app = app
+        self.url_map = url_map
+        self.metrics = Metrics(**options)
+
+    def route_for(self, environ):
+        if self.url_map == None:
+            return UNMATCHED_ROUTE
+        try:
+            rule, _ = self.url_map.bind_to_environ(environ).match(return_rule=True)
+        except Exception:
+            # 404 / 405 / redirects
+            return UNMATCHED_ROUTE
+        return rule.rule
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path in (METRICS_PATH, SLOWEST_PATH):
+            body = self.metrics.render() if path == METRICS_PATH else self.metrics.render_slowest()
+            start_response("200 OK", [("Content-Type", PROMETHEUS_CONTENT_TYPE), ("Content-Length", str(len(body)))])
+            return [body]
+        request = self.metrics.start(environ.get("REQUEST_METHOD", ""), path, thread_id=threading.get_ident())
+        request.route = self.route_for(environ)
+        response = {"status": 500}
+
+        def capture(status, headers, exc_info=None):
+            response["status"] = int(status.split()[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            app_iter = self.app(environ, capture)
+        except Exception:
+            self.metrics.finish(request, 500, 0, error=True)
+            raise
+        return CountingIterator(app_iter, self.metrics, request, response)
+
+
+class CountingIterator:
+    """
+    Counts the body bytes and records the request once the server
+    closes the response, so streaming bodies are timed to the end.
+    """
+    def __init__(self, app_iter, metrics, request, response):
+        self.app_iter = app_iter
+        self.metrics = metrics
+        self.request = request
+        self.response = response
+        self.size = 0
+        self.error = False
+
+    def __iter__(self):
+        try:
+            for chunk in self.app_iter:
+                self.size += len(chunk)
+                yield chunk
+        except Exception:
+            self.error = True
+            raise
+
+    def close(self):
+        try:
+            if hasattr(self.app_iter, "close"):
+                self.app_iter.close()
+        finally:
+            self.metrics.finish(self.request, self.response["status"], self.size, error=self.error)
+
+
+class ASGIMetricsMiddleware:
+    """
+    ASGI: app.add_middleware(ASGIMetricsMiddleware)
+
+    The route is scope["route"].path, set by FastAPI's router on the
+    same scope dict once it has matched the request.
+    """
+    def __init__(self, app, **options):
+        self.app = app
+        self.metrics = Metrics(**options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        if path in (METRICS_PATH, SLOWEST_PATH):
+            body = self.metrics.render() if path == METRICS_PATH else self.metrics.render_slowest()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", PROMETHEUS_CONTENT_TYPE.encode()), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        request = self.metrics.start(scope["method"], path)
+        response = {"status": 500, "size": 0}
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        error = False
+        try:
+            await self.app(scope, receive, counting_send)
+        except Exception:
+            error = True
+            raise
+        finally:
+            request.route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.metrics.finish(request, response["status"], response["size"], error=error)
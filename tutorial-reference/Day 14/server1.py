@@ -1,9 +1,20 @@
-from flask import Flask
+import os
+from flask import Flask, request
 
+from caching_middleware import CachingMiddleware
+from jobs import JobQueue, QueueFull
+from metrics_middleware import MetricsMiddleware
 from logger import trigger_log_save
-from scrape import run as scrape_runner
+from scrape import run as scrape_runner, run_args
 
 app = Flask(__name__)
+# ETag / 304 and gzip, pollers of a job get a 304 until it changes
+app.wsgi_app = CachingMiddleware(app.wsgi_app)
+# /metrics, PROFILE_REQUESTS=1 to sample stacks of the slowest requests
+app.wsgi_app = MetricsMiddleware(app.wsgi_app, url_map=app.url_map, profile=os.environ.get("PROFILE_REQUESTS") == "1")
+
+# scrapes share the http cache and manifest files, run them one at a time
+scrape_jobs = JobQueue(max_workers=1, max_pending=10)
 
 # http://localhost:8000/
 @app.route("/", methods=['GET'])
@@ -19,7 +30,22 @@ def abc_view():
 
 @app.route("/box-office-mojo-scraper", methods=['POST'])
 def box_office_scraper_view():
-    # run other code here.
+    # enqueue the scrape, poll /box-office-mojo-scraper/<job_id> for the result
     trigger_log_save()
-    scrape_runner()
-    return {"data": [1,2,3]}
+    data = request.get_json(silent=True) or {}
+    try:
+        kwargs = run_args(data)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    try:
+        job = scrape_jobs.submit(scrape_runner, **kwargs)
+    except QueueFull as e:
+        return {"error": str(e)}, 503
+    return {"job_id": job['id'], "status": job['status']}, 202
+
+@app.route("/box-office-mojo-scraper/<job_id>", methods=['GET'])
+def box_office_scraper_status_view(job_id):
+    job = scrape_jobs.get(job_id)
+    if job == None:
+        return {"error": "job not found"}, 404
+    return job
@@ -1,9 +1,28 @@
 import os
 import datetime
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, Body, HTTPException
+from pydantic import BaseModel, StrictInt
+from caching_middleware import ASGICachingMiddleware
+from metrics_middleware import ASGIMetricsMiddleware
+from jobs import JobQueue, QueueFull
 from logger import trigger_log_save
-from scrape import run as scrape_runner
+from scrape import run as scrape_runner, run_args
 app = FastAPI()
+# ETag / 304 and gzip, pollers of a job get a 304 until it changes
+app.add_middleware(ASGICachingMiddleware)
+# /metrics, PROFILE_REQUESTS=1 to sample stacks of the slowest requests
+app.add_middleware(ASGIMetricsMiddleware, profile=os.environ.get("PROFILE_REQUESTS") == "1")
+
+# scrapes share the http cache and manifest files, run them one at a time
+scrape_jobs = JobQueue(max_workers=1, max_pending=10)
+
+
+class ScrapeRequest(BaseModel):
+    # strict: "2020" is a 422, not silently turned into 2020
+    start_year: Optional[StrictInt] = None
+    years_ago: Optional[StrictInt] = None
+
 
 @app.get("/")
 def hello_world():
@@ -14,8 +33,24 @@ def abc_view():
     return {"data": [1,2,3]}
 
 
-@app.post("/box-office-mojo-scraper")
-def scrape_runner_view():
+@app.post("/box-office-mojo-scraper", status_code=202)
+def scrape_runner_view(data: ScrapeRequest = Body(default=ScrapeRequest())):
+    # enqueue the scrape, poll /box-office-mojo-scraper/{job_id} for the result
     trigger_log_save()
-    scrape_runner()
-    return {"data": [1,2,3]}
\ No newline at end of file
+    try:
+        kwargs = run_args({"start_year": data.start_year, "years_ago": data.years_ago})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job = scrape_jobs.submit(scrape_runner, **kwargs)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job['id'], "status": job['status']}
+
+
+@app.get("/box-office-mojo-scraper/{job_id}")
+def scrape_status_view(job_id: str):
+    job = scrape_jobs.get(job_id)
+    if job == None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
\ No newline at end of file
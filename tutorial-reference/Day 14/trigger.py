@@ -1,7 +1,17 @@
+import time
 import requests 
 
 ngrok_url = 'https://a5681caa.ngrok.io'
 endpoint = f'{ngrok_url}/box-office-mojo-scraper'
 
 r = requests.post(endpoint, json={})
-print(r.json()['data'])
\ No newline at end of file
+job_id = r.json()['job_id']
+print("job", job_id)
+
+# the scrape runs in the background, poll for its status
+while True:
+    job = requests.get(f"{endpoint}/{job_id}").json()
+    if job['status'] in ("finished", "failed"):
+        break
+    time.sleep(2)
+print(job['status'], job['error'] or job['result'])
\ No newline at end of file
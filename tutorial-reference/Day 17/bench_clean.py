@@ -0,0 +1,80 @@
+"""
+Rows/second of the notebook's df.apply(clean_col, axis=1) cleanup
+vs the vectorized clean.clean(), on the combined dataset repeated
+up to --rows rows.
+
+The apply version is slow, so it runs on --apply-rows rows
+(its rows/second doesn't depend on the table size).
+
+python bench_clean.py --rows 2000000 --apply-rows 50000
+"""
+import time
+import argparse
+import pandas as pd
+
+import clean
+
+
+def currency_str_to_int(current_val):
+    currency_val = current_val.replace("$", "").replace(",", "")
+    try:
+        currency_val = int(currency_val)
+    except:
+        # Takes any row value with "-" and turns into 0
+        currency_val = 0
+    return currency_val
+
+
+def clean_col(row):
+    for col in clean.to_clean_cols:
+        current_val = row[col]
+        row[col] = currency_str_to_int(current_val)
+    return row
+
+
+def apply_clean(df):
+    # the notebook's version, cell for cell
+    df = df.copy()
+    df['Rank'] = -1
+    df['Domestic %'] = df['%']
+    df['Foreign %'] = df['%.1']
+    df.drop(['%', '%.1'], axis=1, inplace=True)
+    df_cleaned = df.apply(clean_col, axis=1)
+    df_cleaned.sort_values(by=['Worldwide'], inplace=True, ascending=False)
+    df_cleaned.reset_index(inplace=True, drop=True)
+    df_cleaned['Rank'] = df_cleaned.index + 1
+    df_cleaned['Domestic %'] = df_cleaned['Domestic'] / df_cleaned['Worldwide']
+    df_cleaned['Foreign %'] = df_cleaned['Foreign'] / df_cleaned['Worldwide']
+    return df_cleaned
+
+
+def scaled(df, rows):
+    repeats = rows // len(df) + 1
+    return pd.concat([df] * repeats, ignore_index=True).iloc[:rows]
+
+
+def measure(func, df):
+    start_time = time.perf_counter()
+    func(df)
+    run_time = time.perf_counter() - start_time
+    return len(df) / run_time, run_time
+
+
+def run(rows=1_000_000, apply_rows=50_000):
+    df = pd.read_csv(clean.working_file)
+    expected = pd.read_csv(clean.output_file)
+    actual = clean.clean(df)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    print(f"clean.clean matches {clean.output_file}")
+
+    for name, func, size in [("apply", apply_clean, apply_rows), ("vectorized", clean.clean, rows)]:
+        rows_per_second, run_time = measure(func, scaled(df, size))
+        print(f"{name:<12}{size:>12,} rows{run_time:>10.2f}s{rows_per_second:>14,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--apply-rows", type=int, default=50_000)
+    args = parser.parse_args()
+    run(rows=args.rows, apply_rows=args.apply_rows)
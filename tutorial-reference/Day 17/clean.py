@@ -0,0 +1,91 @@
+"""
+The cleanup from "3 - Cleanup Data - Transfrom Data.ipynb" as an
+importable module, with the currency columns converted column-wise
+instead of one cell at a time via df.apply(clean_col, axis=1).
+
+python clean.py
+"""
+import os
+import hashlib
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # /Day 17/
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+working_file = os.path.join(CACHE_DIR, 'movies-box-office-dataset.csv')
+output_file = os.path.join(CACHE_DIR, 'movies-box-office-dataset-cleaned.csv')
+# Arrow IPC (uncompressed feather v2) copy that server/main.py memory-maps
+output_arrow_file = os.path.join(CACHE_DIR, 'movies-box-office-dataset-cleaned.arrow')
+# schema metadata key, read by server/dataset_cache.py
+ARROW_SOURCE_KEY = b"source_csv_sha256"
+
+to_clean_cols = ['Worldwide', 'Domestic', 'Foreign']
+
+
+def currency_col_to_int(series):
+    """
+    Vectorized currency_str_to_int: "$1,234" -> 1234,
+    anything that isn't a number ("-") -> 0.
+    Already numeric columns pass through.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.fillna(0).astype("int64")
+    cleaned = series.astype(str).str.replace("$", "", regex=False).str.replace(",", "", regex=False)
+    return pd.to_numeric(cleaned, errors="coerce").fillna(0).astype("int64")
+
+
+def clean(df):
+    df = df.copy()
+    df['Rank'] = -1
+    if '%' in df.columns:
+        # raw scrape: both share columns are labeled "%"
+        df['Domestic %'] = df['%']
+        df['Foreign %'] = df['%.1']
+        df.drop(['%', '%.1'], axis=1, inplace=True)
+    for col in to_clean_cols:
+        df[col] = currency_col_to_int(df[col])
+    # the notebook sorted an object column (df.apply returned objects),
+    # sort the same way so ties in Worldwide keep the same order
+    df.sort_values(by=['Worldwide'], inplace=True, ascending=False, key=lambda col: col.astype(object))
+    df.reset_index(inplace=True, drop=True)
+    df['Rank'] = df.index + 1
+    df['Domestic %'] = df['Domestic'] / df['Worldwide']
+    df['Foreign %'] = df['Foreign'] / df['Worldwide']
+    return df
+
+
+def publish_arrow(df, output_path=output_arrow_file, csv_path=output_file):
+    """
+    Uncompressed so readers can memory-map it without decoding.
+    Written to a temp file and renamed: processes that have the old
+    file mapped keep reading it until they reload.
+
+    The sha256 of the csv it was built from goes in the schema
+    metadata, DatasetCache only uses the arrow file while it matches
+    (mtimes are whatever order git checked the files out in).
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    with open(csv_path, 'rb') as f:
+        metadata[ARROW_SOURCE_KEY] = hashlib.sha256(f.read()).hexdigest().encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{output_path}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def run(input_path=working_file, output_path=output_file, arrow_path=output_arrow_file):
+    df = pd.read_csv(input_path)
+    df_cleaned = clean(df)
+    df_cleaned.to_csv(output_path, index=False)
+    if arrow_path != None:
+        # after the csv, it records the csv's hash
+        publish_arrow(df_cleaned, arrow_path, csv_path=output_path)
+    return df_cleaned
+
+
+if __name__ == "__main__":
+    df = run()
+    print(f"Cleaned {len(df)} rows -> {output_file}")
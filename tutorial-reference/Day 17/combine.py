@@ -0,0 +1,82 @@
+"""
+The combine step from "2 - Combine Data.ipynb" as a reusable module.
+
+The per-year csv files are read on a thread pool with explicit dtypes
+(repeated strings as categoricals) and appended to the combined csv
+one file at a time, in year order. At most `max_workers` files are
+read ahead, so memory stays bounded by a few years of data no matter
+how many years (or regions) are in data/.
+
+python combine.py [data_dir] [output_file]
+"""
+import os
+import sys
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # /Day 17/
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+dataset = os.path.join(CACHE_DIR, 'movies-box-office-dataset.csv')
+
+# columns not in a file are ignored by read_csv
+DTYPES = {
+    "Rank": "Int32",
+    "Release Group": "string",
+    "Worldwide": "string",
+    "Domestic": "string",
+    "Foreign": "string",
+    "%": "category",
+    "%.1": "category",
+}
+
+
+def read_year(csv_path):
+    filename = os.path.basename(csv_path)
+    year = filename.replace(".csv", "")
+    df = pd.read_csv(csv_path, dtype=DTYPES)
+    df['filename'] = pd.Categorical([filename] * len(df))
+    df['year'] = pd.Categorical([year] * len(df))
+    return df
+
+
+def combine(data_dir=DATA_DIR, output_path=dataset, max_workers=4):
+    csv_files = sorted(x for x in os.listdir(data_dir) if x.endswith(".csv"))
+    csv_paths = [os.path.join(data_dir, filename) for filename in csv_files]
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    columns = None
+    total_rows = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        paths = iter(csv_paths)
+        pending = deque(
+            (csv_path, executor.submit(read_year, csv_path))
+            for csv_path in islice(paths, max_workers)
+        )
+        while pending:
+            csv_path, future = pending.popleft()
+            this_df = future.result()
+            # keep `max_workers` reads in flight
+            next_path = next(paths, None)
+            if next_path != None:
+                pending.append((next_path, executor.submit(read_year, next_path)))
+            if columns == None:
+                columns = list(this_df.columns)
+                this_df.to_csv(tmp_path, index=False)
+            else:
+                this_df.reindex(columns=columns).to_csv(tmp_path, mode='a', header=False, index=False)
+            total_rows += len(this_df)
+            print(os.path.basename(csv_path), len(this_df))
+    if columns == None:
+        raise ValueError(f"No csv files in {data_dir}")
+    os.replace(tmp_path, output_path)
+    return total_rows
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    output_path = sys.argv[2] if len(sys.argv) > 2 else dataset
+    rows = combine(data_dir=data_dir, output_path=output_path)
+    print(f"Combined {rows} rows -> {output_path}")
@@ -0,0 +1,100 @@
+"""
+Time to first byte, total time and server peak RSS for
+/box-office vs the streaming /box-office/export.
+
+Each endpoint gets a fresh uvicorn process so its peak RSS
+(VmHWM, Linux only) isn't polluted by the other endpoints.
+
+python bench_export.py [requests_per_endpoint]
+"""
+import os
+import sys
+import time
+import socket
+import subprocess
+import http.client
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINTS = [
+    "/box-office",
+    "/box-office/export?format=ndjson",
+    "/box-office/export?format=csv",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid, field):
+    # VmRSS: current, VmHWM: peak ("high water mark")
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--ws", "none", "--log-level", "warning"],
+        cwd=SERVER_DIR,
+    )
+    for _ in range(200):
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def fetch(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    start_time = time.perf_counter()
+    conn.request("GET", path)
+    response = conn.getresponse()
+    response.read(1)
+    ttfb = time.perf_counter() - start_time
+    size = 1 + len(response.read())
+    total = time.perf_counter() - start_time
+    conn.close()
+    return ttfb, total, size
+
+
+def run(requests_per_endpoint=5):
+    # first: the first request on a fresh process, warm: best of the rest
+    print(f"{'endpoint':<36}{'first ttfb':>11}{'first ms':>10}{'warm ttfb':>11}{'warm ms':>10}{'bytes':>12}{'peak RSS +KiB':>15}")
+    for path in ENDPOINTS:
+        port = free_port()
+        proc = start_server(port)
+        try:
+            rss_before = memory_kb(proc.pid, "VmRSS")
+            timings = [fetch(port, path) for _ in range(requests_per_endpoint)]
+            peak = memory_kb(proc.pid, "VmHWM")
+        finally:
+            proc.terminate()
+            proc.wait()
+        first_ttfb, first_total, size = timings[0]
+        warm = timings[1:] or timings
+        warm_ttfb = min(t[0] for t in warm)
+        warm_total = min(t[1] for t in warm)
+        peak_delta = "n/a" if peak == None or rss_before == None else f"{peak - rss_before:,}"
+        print(f"{path:<36}{first_ttfb * 1000:>11.1f}{first_total * 1000:>10.1f}"
+              f"{warm_ttfb * 1000:>11.1f}{warm_total * 1000:>10.1f}{size:>12,}{peak_delta:>15}")
+
+
+if __name__ == "__main__":
+    try:
+        count = int(sys.argv[1])
+    except:
+        count = 5
+    run(requests_per_endpoint=count)
@@ -0,0 +1,278 @@
+"""
+ETag / If-None-Match and gzip for the JSON APIs, as WSGI (Flask)
+and ASGI (FastAPI) middleware sharing the same logic.
+
+Flask:   app.wsgi_app = CachingMiddleware(app.wsgi_app)
+FastAPI: app.add_middleware(ASGICachingMiddleware)
+
+Only GET 200 responses with a Content-Length are touched,
+streaming responses (no Content-Length) pass through untouched.
+HEAD passes through too: frameworks answer it with an empty body
+but the GET's Content-Length, so there is nothing to hash.
+
+- every response gets a strong ETag (a hash of the body) and
+  Cache-Control: no-cache, so clients revalidate on every poll
+- a matching If-None-Match gets a 304 with no body
+- bodies of at least `min_size` bytes are gzipped when the client
+  accepts it (Vary: Accept-Encoding)
+
+The same bytes object (e.g. DatasetCache.json_bytes) isn't hashed
+again, and gzipped bodies are cached by ETag, so repeated requests
+for a static payload cost a dict lookup.
+
+The same file is in Day 14/, Day 17/server/ and Day_28/src/cfe_os/,
+each day's code runs on its own (Day 28 is frozen with pyinstaller),
+keep the copies identical.
+"""
+import io
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_MAX_BODY = 64 * 1024 * 1024
+DEFAULT_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+# below this size hashing is cheaper than keeping the body around
+MIN_IDENTITY_SIZE = 64 * 1024
+
+
+def make_etag(body):
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def gzip_etag(etag):
+    # the gzipped body is a different representation, so a different strong etag
+    return etag[:-1] + '-gzip"'
+
+
+def opaque_tag(etag):
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    if tag.endswith('-gzip"'):
+        tag = tag[:-6] + '"'
+    return tag
+
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match uses the weak comparison, and either
+    representation (plain or gzip) of the body matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = opaque_tag(etag)
+    return any(opaque_tag(candidate) == tag for candidate in if_none_match.split(","))
+
+
+def accepts_gzip(accept_encoding):
+    """
+    "gzip, deflate, br" -> True, "gzip;q=0" -> False
+    """
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            return True
+    return False
+
+
+def is_compressible(content_type):
+    content_type = (content_type or "").lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class LRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value != None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class HTTPCaching:
+    def __init__(self, min_size=DEFAULT_MIN_SIZE, compresslevel=6, cache_control=DEFAULT_CACHE_CONTROL,
+                 max_body=DEFAULT_MAX_BODY, max_entries=32):
+        self.min_size = min_size
+        self.compresslevel = compresslevel
+        self.cache_control = cache_control
+        self.max_body = max_body
+        # id(body) -> (body, etag), keeping `body` alive so the id can't be reused
+        self.etags = LRU(max_entries)
+        # etag -> gzipped body
+        self.gzipped = LRU(max_entries)
+
+    def cacheable(self, status, headers):
+        if status != 200:
+            return False
+        names = {name.lower(): value for name, value in headers}
+        if "content-encoding" in names or "content-length" not in names:
+            return False
+        try:
+            return int(names["content-length"]) <= self.max_body
+        except ValueError:
+            return False
+
+    def etag(self, body):
+        if len(body) < MIN_IDENTITY_SIZE:
+            return make_etag(body)
+        cached = self.etags.get(id(body))
+        if cached != None and cached[0] is body:
+            return cached[1]
+        etag = make_etag(body)
+        self.etags.set(id(body), (body, etag))
+        return etag
+
+    def compress(self, etag, body):
+        compressed = self.gzipped.get(etag)
+        if compressed == None:
+            # mtime=0: the same body always gzips to the same bytes
+            # (gzip.compress only takes mtime from 3.8, Day 28 runs 3.6)
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=self.compresslevel, mtime=0) as f:
+                f.write(body)
+            compressed = buffer.getvalue()
+            self.gzipped.set(etag, compressed)
+        return compressed
+
+    def respond(self, headers, body, if_none_match=None, accept_encoding=None):
+        """
+        headers: [(name, value)] of a cacheable 200 response.
+        Returns (status, headers, body).
+        """
+        names = {name.lower(): value for name, value in headers}
+        etag = names.get("etag") or self.etag(body)
+        compressible = len(body) >= self.min_size and is_compressible(names.get("content-type"))
+        use_gzip = compressible and accepts_gzip(accept_encoding)
+        headers = [(name, value) for name, value in headers if name.lower() not in ("etag", "content-length", "vary")]
+        headers.append(("ETag", gzip_etag(etag) if use_gzip else etag))
+        if "cache-control" not in names and self.cache_control:
+            headers.append(("Cache-Control", self.cache_control))
+        vary = [value.strip() for value in names.get("vary", "").split(",") if value.strip()]
+        if compressible and "accept-encoding" not in (value.lower() for value in vary):
+            vary.append("Accept-Encoding")
+        if vary:
+            headers.append(("Vary", ", ".join(vary)))
+        if etag_matches(if_none_match, etag):
+            headers = [(name, value) for name, value in headers if name.lower() != "content-type"]
+            return 304, headers, b""
+        if use_gzip:
+            body = self.compress(etag, body)
+            headers.append(("Content-Encoding", "gzip"))
+        headers.append(("Content-Length", str(len(body))))
+        return 200, headers, body
+
+
+class CachingMiddleware:
+    """
+    WSGI: app.wsgi_app = CachingMiddleware(app.wsgi_app)
+    """
+    def __init__(self, app, **options):
+        self.app = app
+        self.caching = HTTPCaching(**options)
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "GET":
+            return self.app(environ, start_response)
+        captured = {}
+        buffered = []
+        calling = True
+
+        def capture(status, headers, exc_info=None):
+            # a deferred start_response means a streaming app, leave it alone
+            if not calling or exc_info or not self.caching.cacheable(int(status.split()[0]), headers):
+                captured["passthrough"] = True
+                return start_response(status, headers, exc_info)
+            captured["headers"] = headers
+            return buffered.append
+
+        app_iter = self.app(environ, capture)
+        calling = False
+        if "headers" not in captured:
+            return app_iter
+        try:
+            body = b"".join(buffered) + b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        status, headers, body = self.caching.respond(
+            captured["headers"],
+            body,
+            if_none_match=environ.get("HTTP_IF_NONE_MATCH"),
+            accept_encoding=environ.get("HTTP_ACCEPT_ENCODING"),
+        )
+        start_response("200 OK" if status == 200 else "304 Not Modified", headers)
+        return [body]
+
+
+class ASGICachingMiddleware:
+    """
+    ASGI: app.add_middleware(ASGICachingMiddleware)
+    """
+    def __init__(self, app, **options):
+        self.app = app
+        self.caching = HTTPCaching(**options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        request_headers = dict(scope["headers"])
+        start = None
+        chunks = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])]
+                if self.caching.cacheable(message["status"], headers):
+                    start = headers
+                    return
+            elif message["type"] == "http.response.body" and start != None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                # a single chunk keeps its identity, so its etag is cached
+                body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+                status, headers, body = self.caching.respond(
+                    start,
+                    body,
+                    if_none_match=request_headers.get(b"if-none-match", b"").decode("latin-1"),
+                    accept_encoding=request_headers.get(b"accept-encoding", b"").decode("latin-1"),
+                )
+                await send({
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, buffered_send)
@@ -0,0 +1,125 @@
+import os
+import hashlib
+import threading
+import pandas as pd
+
+# written by clean.py's publish_arrow(): the sha256 of the csv the arrow file was built from
+ARROW_SOURCE_KEY = b"source_csv_sha256"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Loads the dataset once and keeps both the DataFrame and the
+    JSON response (serialized to bytes on first use) in memory.
+
+    If `arrow_path` exists and was built from the current csv (its
+    schema metadata has the csv's sha256), it is memory-mapped
+    instead of parsing the csv: numeric columns are
+    zero-copy views of the mapped file, so startup is a few ms and
+    every worker process shares the same page-cache pages.
+
+    refresh() is cheap to call per request: it only stats the file.
+    When the mtime changes the file is hashed, and only a changed
+    hash reloads the data. Callbacks registered with on_reload()
+    run after every (re)load so derived data can be rebuilt.
+    """
+    def __init__(self, path, arrow_path=None):
+        self.path = path
+        self.arrow_path = arrow_path
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.df = None
+        self._json_bytes = None
+        self.source_path = None
+        self.mmap = None
+        self.mtime = None
+        self.digest = None
+        # (csv mtime, arrow mtime) -> file to load, so the csv is only hashed when either changes
+        self.source_key = None
+        self.source_choice = None
+        self.load()
+
+    def source(self):
+        """
+        The file to load from: the arrow file unless it's
+        missing or was built from a different csv.
+        """
+        if self.arrow_path == None or not os.path.exists(self.arrow_path):
+            return self.path
+        key = (os.stat(self.path).st_mtime, os.stat(self.arrow_path).st_mtime)
+        if key != self.source_key:
+            self.source_choice = self.arrow_path if self.arrow_matches_csv() else self.path
+            self.source_key = key
+        return self.source_choice
+
+    def arrow_matches_csv(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return False
+        try:
+            with pa.memory_map(self.arrow_path) as f:
+                metadata = pa.ipc.open_file(f).schema.metadata or {}
+        except (OSError, pa.ArrowInvalid):
+            return False
+        return metadata.get(ARROW_SOURCE_KEY) == file_hash(self.path).encode()
+
+    def read(self, source):
+        if source != self.arrow_path:
+            return pd.read_csv(source), None
+        import pyarrow as pa
+        mmap = pa.memory_map(source)
+        table = pa.ipc.open_file(mmap).read_all()
+        return table.to_pandas(split_blocks=True), mmap
+
+    def load(self):
+        source = self.source()
+        mtime = os.stat(source).st_mtime
+        digest = file_hash(source)
+        df, mmap = self.read(source)
+        # the old mapping stays valid for as long as the old df is referenced
+        self.df, self.mmap, self._json_bytes = df, mmap, None
+        self.source_path, self.mtime, self.digest = source, mtime, digest
+        for callback in self.listeners:
+            callback(self)
+
+    @property
+    def json_bytes(self):
+        json_bytes = self._json_bytes
+        if json_bytes == None:
+            json_bytes = self.df.to_json(orient="records", double_precision=15).encode("utf-8")
+            self._json_bytes = json_bytes
+        return json_bytes
+
+    def refresh(self, force=False):
+        """
+        Reload if the file changed on disk (or force=True).
+        Returns True when the data was reloaded.
+        """
+        source = self.source()
+        mtime = os.stat(source).st_mtime
+        if not force and source == self.source_path and mtime == self.mtime:
+            return False
+        with self.lock:
+            if not force and source == self.source_path and mtime == self.mtime:
+                # another request already reloaded it
+                return False
+            if not force and source == self.source_path and file_hash(source) == self.digest:
+                # touched but not changed
+                self.mtime = mtime
+                return False
+            self.load()
+            return True
+
+    def on_reload(self, callback, call_now=True):
+        self.listeners.append(callback)
+        if call_now and self.df is not None:
+            callback(self)
@@ -0,0 +1,35 @@
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 50000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_ndjson(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    rows: every row already serialized to JSON bytes
+    (BoxOfficeIndex.rows), one line per row.
+    """
+    for start in range(0, len(rows), chunk_size):
+        yield b"\n".join(rows[start:start + chunk_size]) + b"\n"
+
+
+def iter_csv(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def iter_export(fmt, df, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Only one chunk is serialized at a time, so per-request memory
+    is bounded by `chunk_size` rows and the first bytes go out
+    before the rest of the table is touched.
+    """
+    if fmt == "ndjson":
+        return iter_ndjson(rows, chunk_size=chunk_size)
+    if fmt == "csv":
+        return iter_csv(df, chunk_size=chunk_size)
+    raise ValueError(f"format must be one of {list(MEDIA_TYPES)}")
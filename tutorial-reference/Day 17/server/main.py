@@ -1,20 +1,127 @@
 import os
-import pandas as pd
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from caching_middleware import ASGICachingMiddleware
+from dataset_cache import DatasetCache
+from metrics_middleware import ASGIMetricsMiddleware
+from export import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, MEDIA_TYPES, iter_export
+from query import BoxOfficeIndex, QueryError
+from rollups import YearRollups, DEFAULT_TOP
+from search import TitleIndex, MAX_LIMIT as SEARCH_MAX_LIMIT
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # /Day 17/
 CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 
 dataset = os.path.join(CACHE_DIR, 'movies-box-office-dataset-cleaned.csv')
+# written by clean.py next to the csv, memory-mapped when present
+dataset_arrow = os.path.join(CACHE_DIR, 'movies-box-office-dataset-cleaned.arrow')
+
+# loaded once at startup, reloaded only when the dataset changes
+box_office = DatasetCache(dataset, arrow_path=dataset_arrow)
+box_office_index = None
+
+def build_index(cache):
+    global box_office_index
+    box_office_index = BoxOfficeIndex(cache.df)
+
+box_office.on_reload(build_index)
+
+# updated in place on reload, only new / removed titles are re-indexed
+title_index = TitleIndex()
+
+def update_title_index(cache):
+    title_index.update(cache.df, box_office_index.rows)
+
+box_office.on_reload(update_title_index)
 
+# only the years whose rows changed are recomputed on reload
+year_rollups = YearRollups()
+
+def update_rollups(cache):
+    year_rollups.update(cache.df)
+
+box_office.on_reload(update_rollups)
 
 app = FastAPI()
+# ETag / 304 and gzip, /box-office is only re-sent when the dataset changed
+app.add_middleware(ASGICachingMiddleware)
+# added last so it is outermost and times the gzip too, PROFILE_REQUESTS=1 to sample stacks
+app.add_middleware(ASGIMetricsMiddleware, profile=os.environ.get("PROFILE_REQUESTS") == "1")
 
 @app.get('/')
 def read_root():
     return {"Hello": "World"}
 
 @app.get("/box-office")
-def read_box_office_numbers():
-    df = pd.read_csv(dataset)
-    return df.to_dict("Rank")
\ No newline at end of file
+def read_box_office_numbers(
+        year: int = None,
+        rank_min: int = None,
+        rank_max: int = None,
+        min_worldwide: int = None,
+        sort: str = None,
+        order: str = None,
+        limit: int = None,
+        cursor: str = None):
+    """
+    No parameters: the whole dataset (a list of rows).
+    Otherwise one page: {"results": [...], "count": n, "next_cursor": "..."}
+    /box-office?year=2019&sort=worldwide&order=desc&limit=10
+    """
+    box_office.refresh()
+    params = dict(year=year, rank_min=rank_min, rank_max=rank_max,
+        min_worldwide=min_worldwide, sort=sort, order=order, limit=limit, cursor=cursor)
+    if all(value == None for value in params.values()):
+        return Response(content=box_office.json_bytes, media_type="application/json")
+    try:
+        content = box_office_index.query_json(**params)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+@app.get("/box-office/export")
+def export_box_office_numbers(format: str = "ndjson", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    The whole dataset streamed in chunks, as NDJSON (one row per line) or csv.
+    /box-office/export?format=csv&chunk_size=5000
+    """
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(MEDIA_TYPES)}")
+    if chunk_size < 1 or chunk_size > MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=400, detail=f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    box_office.refresh()
+    # hold on to this load's data, a reload mid-stream doesn't change the export
+    chunks = iter_export(format, box_office.df, box_office_index.rows, chunk_size=chunk_size)
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format])
+
+@app.get("/box-office/search")
+def search_box_office_titles(q: str, limit: int = 10, fuzzy: bool = True):
+    """
+    /box-office/search?q=aven end  (prefix of each word)
+    /box-office/search?q=avangers  (fuzzy, trigram similarity)
+    """
+    if limit < 1 or limit > SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    box_office.refresh()
+    content = title_index.search_json(q, limit=limit, fuzzy=fuzzy)
+    return Response(content=content, media_type="application/json")
+
+@app.get("/box-office/aggregates")
+def read_box_office_aggregates(year: int = None, top: int = DEFAULT_TOP):
+    """
+    Per year count, sum / mean / percentiles of the grosses,
+    domestic / foreign share and the top films by Worldwide gross.
+    /box-office/aggregates?year=2019&top=5
+    """
+    box_office.refresh()
+    try:
+        content = year_rollups.query_json(year=year, top=top)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+@app.post("/box-office/reload")
+def reload_box_office_numbers():
+    # hot reload, e.g. after the cleanup notebook rewrote the csv
+    reloaded = box_office.refresh(force=True)
+    return {"reloaded": reloaded, "hash": box_office.digest, "rows": len(box_office.df)}
\ No newline at end of file
@@ -0,0 +1,129 @@
+import json
+import numpy as np
+
+SORTABLE_COLUMNS = ["Rank", "Worldwide", "Domestic", "Foreign", "Domestic %", "Foreign %", "year"]
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+SCAN_CHUNK = 256
+
+
+class QueryError(ValueError):
+    pass
+
+
+class BoxOfficeIndex:
+    """
+    Sorted indexes over the box office DataFrame, built once per load.
+
+    - `order[column]`: row positions sorted by column
+    - `year_order[column]`: row positions sorted by (year, column), so
+      every year is one contiguous slice, `year_offsets[year]`
+    - `rows`: every row already serialized to JSON bytes
+
+    A query picks the right slice, binary searches it when the filter
+    is on the sort column and otherwise scans it in small chunks from
+    the cursor until the page is full. The work done depends on the
+    page size, not the size of the table.
+    """
+    def __init__(self, df):
+        lines = df.to_json(orient="records", lines=True, double_precision=15)
+        self.rows = [line.encode("utf-8") for line in lines.splitlines()]
+        self.size = len(self.rows)
+        self.columns = {
+            column: df[column].to_numpy()
+            for column in SORTABLE_COLUMNS if column in df.columns
+        }
+        years = self.columns["year"]
+        self.order = {}
+        self.year_order = {}
+        for column, values in self.columns.items():
+            self.order[column] = np.argsort(values, kind="stable")
+            self.year_order[column] = np.lexsort((values, years))
+        sorted_years = years[self.year_order["year"]]
+        unique_years, starts = np.unique(sorted_years, return_index=True)
+        ends = list(starts[1:]) + [len(sorted_years)]
+        self.year_offsets = {
+            int(year): (int(start), int(end))
+            for year, start, end in zip(unique_years, starts, ends)
+        }
+
+    def sort_column(self, sort):
+        if sort == None:
+            return "Rank"
+        for column in self.columns:
+            if column.lower() == sort.lower():
+                return column
+        raise QueryError(f"Can't sort by {sort}, use one of {list(self.columns)}")
+
+    def candidates(self, column, year=None):
+        if year == None:
+            return self.order[column]
+        start, end = self.year_offsets.get(year, (0, 0))
+        return self.year_order[column][start:end]
+
+    def narrow(self, positions, column, low=None, high=None):
+        # positions are sorted ascending by column: binary search the range
+        values = self.columns[column][positions]
+        start = 0 if low == None else np.searchsorted(values, low, side="left")
+        end = len(values) if high == None else np.searchsorted(values, high, side="right")
+        return positions[start:end]
+
+    def query(self, year=None, rank_min=None, rank_max=None, min_worldwide=None,
+              sort=None, order="asc", limit=DEFAULT_LIMIT, cursor=None):
+        column = self.sort_column(sort)
+        order = "asc" if order == None else order
+        if order not in ("asc", "desc"):
+            raise QueryError("order must be asc or desc")
+        limit = DEFAULT_LIMIT if limit == None else limit
+        if limit < 1 or limit > MAX_LIMIT:
+            raise QueryError(f"limit must be between 1 and {MAX_LIMIT}")
+        try:
+            offset = 0 if cursor == None else int(cursor)
+        except ValueError:
+            raise QueryError("invalid cursor")
+        if offset < 0:
+            raise QueryError("invalid cursor")
+
+        positions = self.candidates(column, year=year)
+        filters = []
+        if column == "Rank":
+            positions = self.narrow(positions, "Rank", rank_min, rank_max)
+        elif rank_min != None or rank_max != None:
+            filters.append(("Rank", rank_min, rank_max))
+        if column == "Worldwide":
+            positions = self.narrow(positions, "Worldwide", min_worldwide)
+        elif min_worldwide != None:
+            filters.append(("Worldwide", min_worldwide, None))
+        if order == "desc":
+            positions = positions[::-1]
+
+        page = []
+        while len(page) < limit and offset < len(positions):
+            chunk = positions[offset:offset + max(SCAN_CHUNK, limit)]
+            if len(chunk) == 0:
+                break
+            mask = np.ones(len(chunk), dtype=bool)
+            for filter_column, low, high in filters:
+                values = self.columns[filter_column][chunk]
+                if low != None:
+                    mask &= values >= low
+                if high != None:
+                    mask &= values <= high
+            matched = np.flatnonzero(mask)[:limit - len(page)]
+            page.extend(chunk[matched])
+            if len(page) == limit and len(matched) > 0:
+                offset += int(matched[-1]) + 1
+            else:
+                offset += len(chunk)
+        next_cursor = str(offset) if offset < len(positions) else None
+        return page, next_cursor
+
+    def query_json(self, **params):
+        page, next_cursor = self.query(**params)
+        return b"".join([
+            b'{"results":[',
+            b",".join(self.rows[i] for i in page),
+            b'],"count":', str(len(page)).encode(),
+            b',"next_cursor":', json.dumps(next_cursor).encode(),
+            b"}",
+        ])
@@ -0,0 +1,95 @@
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from query import QueryError
+
+GROSS_COLUMNS = ["Worldwide", "Domestic", "Foreign"]
+# Rank is left out: it is global, one new film re-ranks every year
+FINGERPRINT_COLUMNS = ["Release Group"] + GROSS_COLUMNS
+PERCENTILES = [25, 50, 75, 90, 99]
+MAX_TOP = 25
+DEFAULT_TOP = 10
+
+
+def row_hashes(df):
+    # one uint64 per row, hashed once for the whole table
+    return pd.util.hash_pandas_object(df[FINGERPRINT_COLUMNS], index=False).to_numpy()
+
+
+def year_rollup(year, df):
+    """
+    Aggregates for one year's rows, as a plain dict ready for json.
+    """
+    rollup = {"year": year, "count": len(df)}
+    for column in GROSS_COLUMNS:
+        values = df[column].to_numpy()
+        rollup[column] = {
+            "sum": int(values.sum()),
+            "mean": float(values.mean()),
+            "percentiles": {
+                f"p{p}": float(value)
+                for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+            },
+        }
+    worldwide = rollup["Worldwide"]["sum"]
+    # share of the year's total, not the mean of each film's share
+    rollup["Domestic %"] = rollup["Domestic"]["sum"] / worldwide if worldwide else None
+    rollup["Foreign %"] = rollup["Foreign"]["sum"] / worldwide if worldwide else None
+    top = df.nlargest(MAX_TOP, "Worldwide")
+    rollup["top"] = [
+        {"Rank": int(rank), "Release Group": title, "Worldwide": int(gross)}
+        for rank, title, gross in zip(top["Rank"], top["Release Group"], top["Worldwide"])
+    ]
+    return rollup
+
+
+class YearRollups:
+    """
+    Per year sums, means, percentiles and top-N, computed when the
+    dataset is loaded so /box-office/aggregates never touches the rows.
+
+    Each year's rows are fingerprinted; update() only recomputes the
+    years whose fingerprint changed (a re-scraped year csv), reuses the
+    rest and drops years that are gone.
+    """
+    def __init__(self):
+        self.rollups = {} # year -> rollup dict
+        self.fingerprints = {} # year -> hash of that year's rows
+
+    def update(self, df):
+        """
+        Returns the years that were recomputed.
+        """
+        rollups, fingerprints, changed = {}, {}, []
+        hashes = row_hashes(df)
+        ranks = dict(zip(zip(df["year"].tolist(), df["Release Group"].tolist()), df["Rank"].tolist()))
+        for year, positions in sorted(df.groupby("year").indices.items()):
+            year = int(year)
+            fingerprint = hashlib.sha1(hashes[positions].tobytes()).hexdigest()
+            fingerprints[year] = fingerprint
+            if self.fingerprints.get(year) == fingerprint:
+                rollup = self.rollups[year]
+            else:
+                rollup = year_rollup(year, df.iloc[positions])
+                changed.append(year)
+            # Rank is global, refresh it in the (reused) top-N without recomputing
+            for row in rollup["top"]:
+                row["Rank"] = ranks.get((year, row["Release Group"]), row["Rank"])
+            rollups[year] = rollup
+        # swap in one go, requests never see a half updated set
+        self.rollups, self.fingerprints = rollups, fingerprints
+        return changed
+
+    def query(self, year=None, top=DEFAULT_TOP):
+        if top < 0 or top > MAX_TOP:
+            raise QueryError(f"top must be between 0 and {MAX_TOP}")
+        rollups = self.rollups
+        if year != None and year not in rollups:
+            raise QueryError(f"No data for {year}, use one of {list(rollups)}")
+        years = list(rollups) if year == None else [year]
+        return [dict(rollups[y], top=rollups[y]["top"][:top]) for y in years]
+
+    def query_json(self, year=None, top=DEFAULT_TOP):
+        return json.dumps({"results": self.query(year=year, top=top)}).encode("utf-8")
@@ -0,0 +1,242 @@
+import re
+import heapq
+import bisect
+import unicodedata
+from collections import Counter
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+MIN_FUZZY_SCORE = 0.3
+
+
+def normalize(text):
+    """
+    "Amélie (2001)!" -> "amelie 2001"
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def make_doc(key, title):
+    norm = normalize(title)
+    return {
+        "key": key,
+        "title": title,
+        "norm": norm,
+        "tokens": set(norm.split()),
+        "trigrams": trigrams(norm),
+        "row": None,
+        "worldwide": 0,
+    }
+
+
+class SearchState:
+    """
+    One generation of the index. Searches read a single state from
+    start to finish, update() builds the next one and swaps it in.
+
+    - sorted (title, doc id) list: titles starting with the query
+      are one bisect range
+    - token -> doc ids (inverted index) plus a sorted token list,
+      for matching a prefix of any word in the title
+    - trigram -> doc ids, for fuzzy (typo tolerant) matching
+    - pop_rank: doc id -> position by Worldwide gross, to break ties
+    """
+    def __init__(self, docs=None, tokens=None, trigram_index=None):
+        self.docs = {} if docs == None else docs # doc id -> {"key", "title", "norm", "tokens", "trigrams", "row", "worldwide"}
+        self.tokens = {} if tokens == None else tokens
+        self.trigram_index = {} if trigram_index == None else trigram_index
+        self.sorted_tokens = []
+        self.sorted_titles = []
+        self.pop_rank = {}
+        # postings (doc id sets) already copied into this state, safe to change
+        self.copied = set()
+
+    def next(self):
+        """
+        A copy to build the next generation in. The dicts are copied,
+        the postings sets are shared until add() / remove() copy them.
+        """
+        state = SearchState(dict(self.docs), dict(self.tokens), dict(self.trigram_index))
+        state.sorted_tokens = self.sorted_tokens
+        state.sorted_titles = self.sorted_titles
+        return state
+
+    def postings(self, index, name, key):
+        if (name, key) not in self.copied:
+            index[key] = set(index.get(key, ()))
+            self.copied.add((name, key))
+        return index[key]
+
+    def add(self, doc_id, doc):
+        self.docs[doc_id] = doc
+        for token in doc["tokens"]:
+            self.postings(self.tokens, "tokens", token).add(doc_id)
+        for gram in doc["trigrams"]:
+            self.postings(self.trigram_index, "trigrams", gram).add(doc_id)
+
+    def remove(self, doc_id):
+        doc = self.docs.pop(doc_id)
+        for token in doc["tokens"]:
+            postings = self.postings(self.tokens, "tokens", token)
+            postings.discard(doc_id)
+            if not postings:
+                del self.tokens[token]
+        for gram in doc["trigrams"]:
+            postings = self.postings(self.trigram_index, "trigrams", gram)
+            postings.discard(doc_id)
+            if not postings:
+                del self.trigram_index[gram]
+
+    def prefix_docs(self, prefix):
+        docs = set()
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            docs |= self.tokens[token]
+        return docs
+
+    def prefix_search(self, query_tokens):
+        """
+        Every query word must start a word of the title:
+        "aven end" finds "Avengers: Endgame".
+        """
+        candidates = None
+        # rarest (longest) prefix first keeps the intersections small
+        for token in sorted(query_tokens, key=len, reverse=True):
+            docs = self.prefix_docs(token)
+            candidates = docs if candidates == None else candidates & docs
+            if not candidates:
+                return set()
+        return candidates
+
+    def top(self, doc_ids, limit):
+        # most popular first
+        return heapq.nsmallest(limit, doc_ids, key=self.pop_rank.__getitem__)
+
+    def title_prefix_search(self, query):
+        """
+        Titles that start with the query, exact matches first.
+        """
+        start = bisect.bisect_left(self.sorted_titles, (query,))
+        end = bisect.bisect_left(self.sorted_titles, (query + "\x7f",))
+        exact, rest = [], []
+        for norm, doc_id in self.sorted_titles[start:end]:
+            (exact if norm == query else rest).append(doc_id)
+        return exact, rest
+
+    def fuzzy_search(self, query, limit, exclude):
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.trigram_index.get(gram, ()))
+        # jaccard <= shared / len(query_grams), stop once that is too low
+        min_shared = MIN_FUZZY_SCORE * len(query_grams)
+        scored = []
+        for doc_id, count in shared.most_common():
+            if count < min_shared:
+                break
+            if doc_id in exclude:
+                continue
+            doc_grams = len(self.docs[doc_id]["trigrams"])
+            score = count / (len(query_grams) + doc_grams - count) # jaccard
+            if score >= MIN_FUZZY_SCORE:
+                scored.append((score * 0.8, doc_id)) # below any prefix match
+        ranked = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], self.pop_rank[item[1]]))
+        return [(score, doc_id) for score, doc_id in ranked]
+
+
+class TitleIndex:
+    """
+    In-memory title search over the box office rows (see SearchState).
+
+    Docs are keyed by (title, year), so update() only tokenizes the
+    titles that were added or removed since the last load. It builds
+    a new SearchState and swaps it in at the end, searches running
+    in the threadpool during a reload keep using the old one.
+    """
+    def __init__(self):
+        self.state = SearchState()
+        self.doc_ids = {} # key -> doc id
+        self.next_id = 0
+
+    def update(self, df, rows):
+        """
+        df: the dataset, rows: each row of df serialized to JSON bytes.
+        Returns (added, removed) counts.
+        """
+        seen = Counter()
+        new_keys = {}
+        titles = df["Release Group"].tolist()
+        years = df["year"].tolist()
+        worldwide = df["Worldwide"].tolist()
+        for i, (title, year) in enumerate(zip(titles, years)):
+            key = (title, year, seen[(title, year)])
+            seen[(title, year)] += 1
+            new_keys[key] = i
+
+        state = self.state.next()
+        doc_ids = dict(self.doc_ids)
+        removed = [key for key in doc_ids if key not in new_keys]
+        for key in removed:
+            state.remove(doc_ids.pop(key))
+        added = 0
+        for key, i in new_keys.items():
+            doc_id = doc_ids.get(key)
+            if doc_id == None:
+                doc_id = self.next_id
+                self.next_id += 1
+                doc_ids[key] = doc_id
+                state.add(doc_id, make_doc(key, titles[i]))
+                added += 1
+            # row contents (rank, grosses) can change without the title changing,
+            # a new dict: the old state's doc stays as it was
+            state.docs[doc_id] = dict(state.docs[doc_id], row=rows[i], worldwide=worldwide[i])
+        if added or removed:
+            state.sorted_tokens = sorted(state.tokens)
+            state.sorted_titles = sorted((doc["norm"], doc_id) for doc_id, doc in state.docs.items())
+        by_worldwide = sorted(state.docs, key=lambda doc_id: state.docs[doc_id]["worldwide"], reverse=True)
+        state.pop_rank = {doc_id: rank for rank, doc_id in enumerate(by_worldwide)}
+        state.copied = set()
+        # swap in one go, requests never see a half updated index
+        self.state, self.doc_ids = state, doc_ids
+        return added, len(removed)
+
+    def search(self, query, limit=DEFAULT_LIMIT, fuzzy=True):
+        """
+        Returns [(score, match, doc)], best first:
+        1.0 exact title, 0.9 title starts with the query,
+        0.8 every query word starts a title word, < 0.8 fuzzy.
+        Ties go to the bigger Worldwide gross.
+        """
+        query = normalize(query)
+        if query == "":
+            return []
+        # one state for the whole search, a reload swaps in a new one
+        state = self.state
+        exact, starts_with = state.title_prefix_search(query)
+        results = [(1.0, "prefix", doc_id) for doc_id in state.top(exact, limit)]
+        results += [(0.9, "prefix", doc_id) for doc_id in state.top(starts_with, limit - len(results))]
+        if len(results) < limit:
+            seen = set(exact) | set(starts_with)
+            word_matches = state.prefix_search(query.split()) - seen
+            results += [(0.8, "prefix", doc_id) for doc_id in state.top(word_matches, limit - len(results))]
+        if fuzzy and len(results) < limit:
+            seen = {doc_id for _, _, doc_id in results}
+            for score, doc_id in state.fuzzy_search(query, limit - len(results), seen):
+                results.append((score, "fuzzy", doc_id))
+        return [(score, match, state.docs[doc_id]) for score, match, doc_id in results]
+
+    def search_json(self, query, limit=DEFAULT_LIMIT, fuzzy=True):
+        results = [
+            b'{"score":%.4f,"match":"%s","row":%s}' % (score, match.encode(), doc["row"])
+            for score, match, doc in self.search(query, limit=limit, fuzzy=fuzzy)
+        ]
+        return b'{"results":[' + b",".join(results) + b"]}"
@@ -0,0 +1,77 @@
+# uvicorn asgi_server:app
+# the same views and templates as server.py, served by an async server:
+# a slow client is a suspended coroutine, not a blocked thread
+
+import os
+
+from routes import Router, normalize
+from static_files import serve_file
+from template_cache import BASE_DIR
+from views import home, contact_us, not_found
+
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+router = Router()
+
+# views return the html as bytes, or (status, headers, body)
+router.add("/", home)
+router.add("/contact", contact_us)
+
+
+def scope_environ(scope):
+    # the parts of a WSGI environ serve_file() reads
+    environ = {"REQUEST_METHOD": scope["method"], "SERVER_SOFTWARE": "asgi"}
+    for name, value in scope["headers"]:
+        key = "HTTP_" + name.decode("latin-1").upper().replace("-", "_")
+        environ[key] = value.decode("latin-1")
+    return environ
+
+@router.route("/static/<path:filename>")
+def static(scope, filename):
+    return serve_file(scope_environ(scope), STATIC_DIR, filename)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    path = scope["path"]
+    view, params = router.match(path)
+    data = None if view == None else view(scope, **params)
+    if data == None:
+        data = not_found(scope, normalize(path))
+    if isinstance(data, bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html"),
+                (b"content-length", str(len(data)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": data})
+        return
+    status, headers, body = data
+    await send({
+        "type": "http.response.start",
+        "status": int(status.split()[0]),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    # the file is streamed in BLOCK_SIZE chunks, read from the page cache
+    # between sends, instead of being loaded into memory whole
+    try:
+        for chunk in body:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,135 @@
+"""
+Requests/second of the Router vs the old if/elif dispatcher,
+calling the WSGI apps in-process (no sockets, so only the
+dispatch + view + response cost is measured).
+
+1. the real apps: the old server.py (if/elif, template read from
+   disk per request) vs the current one
+2. dispatch only, with --routes extra exact routes: an if/elif chain
+   is a linear scan, the Router is a dict lookup
+3. a static file through wsgiref's file_wrapper: full, Range and 304
+
+python bench_routes.py --requests 20000 --routes 200
+"""
+import os
+import time
+import argparse
+from wsgiref.util import FileWrapper
+
+import server
+from routes import Router
+from static_files import make_etag
+from template_cache import BASE_DIR
+
+
+def render_template(template_name='index.html', context={}):
+    # the old server.py, before the template cache
+    html_str = ""
+    with open(os.path.join(BASE_DIR, template_name), 'r') as f:
+        html_str = f.read()
+        html_str = html_str.format(**context)
+    return html_str
+
+def legacy_app(environ, start_response):
+    path = environ.get("PATH_INFO")
+    if path.endswith("/"):
+        path = path[:-1]
+    if path == "": # index / root of the web app
+        data = render_template(template_name='index.html', context={})
+    elif path == "/contact":
+        data = render_template(template_name='contact.html', context={})
+    else:
+        data = render_template(template_name='404.html', context={"path": path})
+    data = data.encode("utf-8")
+    start_response(
+        f"200 OK", [
+            ("Content-Type", "text/html"),
+            ("Content-Length", str(len(data)))
+        ]
+    )
+    return iter([data])
+
+
+def start_response(status, headers, exc_info=None):
+    pass
+
+
+def call(app, environ):
+    body = app(environ, start_response)
+    for _ in body:
+        pass
+    if hasattr(body, "close"):
+        body.close()
+
+
+def requests_per_second(app, environs, requests):
+    start_time = time.perf_counter()
+    for i in range(requests):
+        call(app, environs[i % len(environs)])
+    return requests / (time.perf_counter() - start_time)
+
+
+def environ_for(path, **headers):
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "wsgi.file_wrapper": FileWrapper}
+    environ.update(headers)
+    return environ
+
+
+def scaled_dispatchers(extra_routes):
+    # the last route is the worst case for an if/elif chain
+    paths = [f"/page-{i}" for i in range(extra_routes)]
+    view = lambda environ: b"ok"
+    chain = [(path, view) for path in paths]
+
+    def chain_app(environ, start_response):
+        path = environ["PATH_INFO"]
+        for route_path, route_view in chain:
+            if path == route_path:
+                data = route_view(environ)
+                break
+        start_response("200 OK", [("Content-Length", str(len(data)))])
+        return [data]
+
+    router = Router()
+    for path in paths:
+        router.add(path, view)
+
+    def router_app(environ, start_response):
+        route_view, params = router.match(environ["PATH_INFO"])
+        data = route_view(environ, **params)
+        start_response("200 OK", [("Content-Length", str(len(data)))])
+        return [data]
+
+    return chain_app, router_app, paths
+
+
+def run(requests=20000, extra_routes=200):
+    print(f"{'':<34}{'if/elif':>12}{'Router':>12}{'speedup':>10}")
+    for label, path in [("/", "/"), ("/contact", "/contact"), ("404", "/missing")]:
+        environs = [environ_for(path)]
+        old = requests_per_second(legacy_app, environs, requests)
+        new = requests_per_second(server.app, environs, requests)
+        print(f"{'app ' + label:<34}{old:>12,.0f}{new:>12,.0f}{new / old:>9.1f}x")
+
+    chain_app, router_app, paths = scaled_dispatchers(extra_routes)
+    for label, path in [("first", paths[0]), ("last", paths[-1])]:
+        environs = [environ_for(path)]
+        old = requests_per_second(chain_app, environs, requests)
+        new = requests_per_second(router_app, environs, requests)
+        print(f"{f'dispatch, {extra_routes} routes, {label}':<34}{old:>12,.0f}{new:>12,.0f}{new / old:>9.1f}x")
+
+    etag = make_etag(os.stat(os.path.join(server.STATIC_DIR, "style.css")))
+    print(f"{'':<34}{'req/s':>12}")
+    for label, environ in [
+            ("static full", environ_for("/static/style.css")),
+            ("static Range", environ_for("/static/style.css", HTTP_RANGE="bytes=0-9")),
+            ("static 304", environ_for("/static/style.css", HTTP_IF_NONE_MATCH=etag))]:
+        print(f"{label:<34}{requests_per_second(server.app, [environ], requests):>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=200)
+    args = parser.parse_args()
+    run(requests=args.requests, extra_routes=args.routes)
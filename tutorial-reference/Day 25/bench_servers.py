@@ -0,0 +1,174 @@
+"""
+WSGI (gunicorn, gthread worker) vs ASGI (uvicorn) serving the same
+views, driven by --clients concurrent keep-alive connections, each
+sending GET requests back to back for --duration seconds.
+
+Reports requests/s, latency percentiles and memory per connection:
+(server RSS with every client connected - idle RSS) / clients,
+summed over the server's processes (gunicorn master + worker).
+
+gunicorn gets `--threads` threads: a keep-alive connection holds
+one while its request is served, clients beyond that wait in line.
+
+python bench_servers.py --clients 200 --duration 10 --threads 8
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import http.client
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # /Day 25/
+
+SERVERS = {
+    "wsgi": lambda port, threads: [
+        sys.executable, "-m", "gunicorn", "server:app", "--bind", f"127.0.0.1:{port}",
+        "--workers", "1", "--worker-class", "gthread", "--threads", str(threads),
+        "--keep-alive", "60", "--log-level", "warning",
+    ],
+    "asgi": lambda port, threads: [
+        sys.executable, "-m", "uvicorn", "asgi_server:app", "--port", str(port),
+        "--ws", "none", "--lifespan", "on", "--log-level", "warning",
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree(pid):
+    # pid and its children (gunicorn's workers), Linux only
+    pids = [pid]
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            pids.append(int(entry))
+    return pids
+
+
+def tree_rss_kb(pid):
+    return sum(rss_kb(p) for p in process_tree(pid))
+
+
+def start_server(name, port, threads):
+    proc = subprocess.Popen(SERVERS[name](port, threads), cwd=BASE_DIR)
+    for _ in range(200):
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            if proc.poll() != None:
+                raise RuntimeError(f"{name} server exited, is it installed?")
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f"{name} server did not start")
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+
+
+async def client(port, path, connected, start, stop_time, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n".encode()
+    connected.release()
+    await start.wait()
+    try:
+        while time.perf_counter() < stop_time[0]:
+            start_time = time.perf_counter()
+            writer.write(request)
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        writer.close()
+
+
+async def drive(port, pid, clients, duration, path):
+    connected = asyncio.Semaphore(0)
+    start = asyncio.Event()
+    stop_time = [0]
+    latencies = []
+    tasks = [asyncio.ensure_future(client(port, path, connected, start, stop_time, latencies)) for _ in range(clients)]
+    for _ in range(clients):
+        await connected.acquire()
+    await asyncio.sleep(0.5) # let the server settle with every connection open
+    connected_rss = tree_rss_kb(pid)
+    stop_time[0] = time.perf_counter() + duration
+    start_time = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    run_time = time.perf_counter() - start_time
+    return latencies, run_time, connected_rss
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(clients=100, duration=10, threads=8, path="/", servers=("wsgi", "asgi")):
+    print(f"{clients} keep-alive clients, {duration}s, GET {path}")
+    print(f"{'server':<8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'idle RSS':>11}{'KiB/conn':>10}")
+    for name in servers:
+        port = free_port()
+        try:
+            proc = start_server(name, port, threads)
+        except RuntimeError as e:
+            print(f"{name:<8}skipped: {e}")
+            continue
+        try:
+            time.sleep(0.5)
+            idle_rss = tree_rss_kb(proc.pid)
+            latencies, run_time, connected_rss = asyncio.run(drive(port, proc.pid, clients, duration, path))
+        finally:
+            proc.terminate()
+            proc.wait()
+        per_connection = (connected_rss - idle_rss) / clients
+        print(f"{name:<8}{len(latencies) / run_time:>10,.0f}"
+              f"{percentile(latencies, 50) * 1000:>9.2f}{percentile(latencies, 95) * 1000:>9.2f}{percentile(latencies, 99) * 1000:>9.2f}"
+              f"{idle_rss:>9,}KB{per_connection:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn gthread threads")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--servers", default="wsgi,asgi")
+    args = parser.parse_args()
+    run(clients=args.clients, duration=args.duration, threads=args.threads, path=args.path,
+        servers=args.servers.split(","))
@@ -0,0 +1,77 @@
+import re
+
+CONVERTERS = {
+    "str": r"[^/]+",
+    "int": r"\d+",
+    "path": r".+",
+}
+CASTS = {
+    "int": int,
+}
+PARAM_RE = re.compile(r"<(?:(\w+):)?(\w+)>")
+
+
+def normalize(path):
+    # same as the old dispatcher: "/contact/" -> "/contact", "/" -> ""
+    if path.endswith("/"):
+        path = path[:-1]
+    return path
+
+
+class Router:
+    """
+    Exact paths are one dict lookup, no matter how many routes.
+
+    Paths with parameters ("/movies/<int:year>", "/static/<path:filename>")
+    are compiled to regexes and grouped by their first segment,
+    so a request only tries the few routes that could match.
+    """
+    def __init__(self):
+        self.exact = {} # path -> view
+        self.dynamic = {} # first segment -> [(regex, casts, view)]
+
+    def add(self, path, view):
+        path = normalize(path)
+        if not PARAM_RE.search(path):
+            self.exact[path] = view
+            return view
+        pattern = ""
+        casts = {}
+        position = 0
+        for match in PARAM_RE.finditer(path):
+            converter, name = match.group(1) or "str", match.group(2)
+            pattern += re.escape(path[position:match.start()])
+            pattern += f"(?P<{name}>{CONVERTERS[converter]})"
+            if converter in CASTS:
+                casts[name] = CASTS[converter]
+            position = match.end()
+        pattern += re.escape(path[position:])
+        first_segment = path.split("/")[1]
+        if PARAM_RE.search(first_segment):
+            first_segment = None # "/<name>" could be anything
+        self.dynamic.setdefault(first_segment, []).append((re.compile(pattern + "$"), casts, view))
+        return view
+
+    def route(self, path):
+        def decorator(view):
+            return self.add(path, view)
+        return decorator
+
+    def match(self, path):
+        """
+        Returns (view, params), (None, {}) when nothing matches.
+        """
+        path = normalize(path)
+        view = self.exact.get(path)
+        if view != None:
+            return view, {}
+        first_segment = path.split("/", 2)[1] if path.count("/") else ""
+        for key in (first_segment, None):
+            for regex, casts, view in self.dynamic.get(key, ()):
+                match = regex.match(path)
+                if match:
+                    params = match.groupdict()
+                    for name, cast in casts.items():
+                        params[name] = cast(params[name])
+                    return view, params
+        return None, {}
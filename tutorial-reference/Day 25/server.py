@@ -4,41 +4,39 @@
 
 # Model -> View -> Template -> Response
 
+import os
 
-def render_template(template_name='index.html', context={}):
-    html_str = ""
-    with open(template_name, 'r') as f:
-        html_str = f.read()
-        html_str = html_str.format(**context)
-    return html_str
-
-def home(environ):
-    return render_template(
-        template_name='index.html', 
-        context={}
-    )
-
-def contact_us(environ):
-    return render_template(
-        template_name='contact.html', 
-        context={}
-    )
+from routes import Router, normalize
+from static_files import serve_file
+from template_cache import BASE_DIR
+from views import templates, render_template, home, contact_us, not_found
+
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+router = Router()
+
+# views return the html as bytes, or (status, headers, body)
+router.add("/", home)
+router.add("/contact", contact_us)
+
+@router.route("/static/<path:filename>")
+def static(environ, filename):
+    return serve_file(environ, STATIC_DIR, filename)
 
 def app(environ, start_response):
     path = environ.get("PATH_INFO")
-    if path.endswith("/"):
-        path = path[:-1]
-    if path == "": # index / root of the web app
-        data = home(environ)
-    elif path == "/contact":
-        data = contact_us(environ)
-    else:
-        data = render_template(template_name='404.html', context={"path": path})
-    data = data.encode("utf-8")
-    start_response(
-        f"200 OK", [
-            ("Content-Type", "text/html"),
-            ("Content-Length", str(len(data)))
-        ]
-    )
-    return iter([data])
\ No newline at end of file
+    view, params = router.match(path)
+    data = None if view == None else view(environ, **params)
+    if data == None:
+        data = not_found(environ, normalize(path))
+    if isinstance(data, bytes):
+        start_response(
+            f"200 OK", [
+                ("Content-Type", "text/html"),
+                ("Content-Length", str(len(data)))
+            ]
+        )
+        return iter([data])
+    status, headers, body = data
+    start_response(status, headers)
+    return body
@@ -0,0 +1,142 @@
+"""
+Static files for the Day 25 WSGI app (asgi_server.py passes an
+environ built from the ASGI scope and streams the body itself).
+
+The file object is handed to the server's wsgi.file_wrapper, so
+gunicorn sends it with sendfile() (zero-copy: the bytes go from the
+page cache to the socket without passing through Python).
+For a Range request the file is seeked to the start and the
+Content-Length is the range length, which is exactly what gunicorn's
+sendfile path sends.
+
+- ETag / Last-Modified, If-None-Match / If-Modified-Since -> 304
+- single "bytes=" Range (and If-Range) -> 206, unsatisfiable -> 416
+"""
+import os
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+
+BLOCK_SIZE = 64 * 1024
+
+
+def safe_join(root, filename):
+    # "../server.py" and absolute paths can't escape root
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def make_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def not_modified(environ, etag, mtime):
+    if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+    if if_none_match != None:
+        tags = [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = environ.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since != None:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def byte_position(value):
+    # digits only, int() would also take "-5", "+5" and " 5"
+    if not value.isdigit():
+        raise ValueError(f"invalid byte position {value!r}")
+    return int(value)
+
+
+def parse_range(range_header, size):
+    """
+    "bytes=0-99" -> (0, 99), "bytes=-100" -> the last 100 bytes.
+    Returns None to send the whole file (no / multiple / malformed
+    ranges) and "unsatisfiable" when the range is past the end.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[6:].strip().partition("-")
+    try:
+        if start == "":
+            length = byte_position(end)
+            if length == 0:
+                return "unsatisfiable"
+            return max(size - length, 0), size - 1
+        start = byte_position(start)
+        end = size - 1 if end == "" else min(byte_position(end), size - 1)
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def iter_file(f, length, block_size=BLOCK_SIZE):
+    try:
+        while length > 0:
+            chunk = f.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def serve_file(environ, root, filename):
+    """
+    Returns (status, headers, body) like the other views,
+    or None when there is no such file.
+    """
+    path = safe_join(root, filename)
+    if path == None or not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    etag = make_etag(stat)
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = [
+        ("Content-Type", content_type),
+        ("ETag", etag),
+        ("Last-Modified", formatdate(stat.st_mtime, usegmt=True)),
+        ("Accept-Ranges", "bytes"),
+    ]
+    if not_modified(environ, etag, stat.st_mtime):
+        return "304 Not Modified", headers, []
+
+    size = stat.st_size
+    status, start, length = "200 OK", 0, size
+    byte_range = parse_range(environ.get("HTTP_RANGE"), size)
+    if_range = environ.get("HTTP_IF_RANGE")
+    if byte_range != None and if_range != None and if_range not in (etag, formatdate(stat.st_mtime, usegmt=True)):
+        # the file changed since the client's partial copy, send all of it
+        byte_range = None
+    if byte_range == "unsatisfiable":
+        headers.append(("Content-Range", f"bytes */{size}"))
+        headers.append(("Content-Length", "0"))
+        return "416 Range Not Satisfiable", headers, []
+    if byte_range != None:
+        start, end = byte_range
+        status, length = "206 Partial Content", end - start + 1
+        headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+    headers.append(("Content-Length", str(length)))
+    if environ.get("REQUEST_METHOD") == "HEAD":
+        return status, headers, []
+
+    f = open(path, "rb")
+    f.seek(start)
+    file_wrapper = environ.get("wsgi.file_wrapper")
+    if file_wrapper != None and length == size - start:
+        # through to the end of the file: the server can sendfile() it
+        return status, headers, file_wrapper(f, BLOCK_SIZE)
+    if file_wrapper != None:
+        # gunicorn's sendfile stops at Content-Length, other servers
+        # would send the file to the end, so only trust it for gunicorn
+        if environ.get("SERVER_SOFTWARE", "").startswith("gunicorn"):
+            return status, headers, file_wrapper(f, BLOCK_SIZE)
+    return status, headers, iter_file(f, length)
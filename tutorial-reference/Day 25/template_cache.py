@@ -0,0 +1,91 @@
+import os
+import time
+from string import Formatter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # /Day 25/
+
+
+def compile_template(html_str):
+    """
+    Splits the format string once: [(literal, field_name)].
+    Returns None if a field needs more than a plain lookup
+    ({a.b}, {a[0]}, {a!r}, {a:>10}), those go through str.format.
+    """
+    parts = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(html_str):
+        if field_name != None and (format_spec or conversion or not field_name.isidentifier()):
+            return None
+        parts.append((literal, field_name))
+    return parts
+
+
+class Template:
+    def __init__(self, path, mtime, html_str):
+        self.path = path
+        self.mtime = mtime
+        self.html_str = html_str
+        self.parts = compile_template(html_str)
+        self._static_bytes = None
+
+    def render(self, context):
+        if self.parts == None:
+            return self.html_str.format(**context)
+        out = []
+        for literal, field_name in self.parts:
+            out.append(literal)
+            if field_name != None:
+                out.append(str(context[field_name]))
+        return "".join(out)
+
+    @property
+    def static_bytes(self):
+        # rendered with an empty context, encoded once
+        if self._static_bytes == None:
+            self._static_bytes = self.render({}).encode("utf-8")
+        return self._static_bytes
+
+
+class TemplateCache:
+    """
+    Each template is read and compiled once and kept in memory.
+
+    The file's mtime is checked at most every `check_interval`
+    seconds (0: on every render), a newer file is read again,
+    so editing a template still shows up without a restart.
+    """
+    def __init__(self, base_dir=BASE_DIR, check_interval=1.0):
+        self.base_dir = base_dir
+        self.check_interval = check_interval
+        self.templates = {} # template_name -> Template
+        self.checked = {} # template_name -> last mtime check
+
+    def load(self, template_name):
+        path = os.path.join(self.base_dir, template_name)
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r') as f:
+            html_str = f.read()
+        template = Template(path, mtime, html_str)
+        self.templates[template_name] = template
+        return template
+
+    def get(self, template_name):
+        template = self.templates.get(template_name)
+        if template == None:
+            template = self.load(template_name)
+            self.checked[template_name] = time.monotonic()
+            return template
+        now = time.monotonic()
+        if now - self.checked[template_name] >= self.check_interval:
+            self.checked[template_name] = now
+            if os.stat(template.path).st_mtime != template.mtime:
+                template = self.load(template_name)
+        return template
+
+    def render(self, template_name, context={}):
+        return self.get(template_name).render(context)
+
+    def render_bytes(self, template_name, context={}):
+        template = self.get(template_name)
+        if not context:
+            return template.static_bytes
+        return template.render(context).encode("utf-8")
@@ -0,0 +1,29 @@
+# Model -> View -> Template -> Response
+# shared by the WSGI (server.py) and ASGI (asgi_server.py) apps,
+# `request` is the WSGI environ or the ASGI scope
+
+from template_cache import TemplateCache
+
+# templates are read once, re-read when the file changes
+templates = TemplateCache()
+
+
+def render_template(template_name='index.html', context={}):
+    html_str = templates.render(template_name, context)
+    return html_str
+
+def home(request):
+    # empty context: the same pre-encoded bytes every time
+    return templates.render_bytes(
+        template_name='index.html',
+        context={}
+    )
+
+def contact_us(request):
+    return templates.render_bytes(
+        template_name='contact.html',
+        context={}
+    )
+
+def not_found(request, path):
+    return templates.render_bytes(template_name='404.html', context={"path": path})
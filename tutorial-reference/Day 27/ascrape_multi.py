@@ -1,13 +1,20 @@
+import sys
 import asyncio
 from aiohttp import ClientSession
 import pathlib
 
+from stream import fetch_to_file
+
 async def fetch(url, session, year):
     async with session.get(url) as response:
         html_body = await response.read()
         return {"body": html_body, "year": year}
 
-async def main(start_year=2020, years_ago=5):
+async def main(start_year=2020, years_ago=5, output_dir=None):
+    """
+    With output_dir each page is written to disk as soon as it
+    arrives and the results only hold {"year", "status", "path", "size"}.
+    """
     html_body = ""
     tasks = []
     # semaphore
@@ -16,24 +23,39 @@ async def main(start_year=2020, years_ago=5):
             year = start_year - i
             url = f'https://www.boxofficemojo.com/year/{year}/'
             print("year", year, url)
+            if output_dir != None:
+                coro = fetch_to_file(url, session, output_dir, year=year)
+            else:
+                coro = fetch(url, session, year)
             tasks.append(
-                asyncio.create_task(
-                    fetch(url, session, year)
-                )
+                asyncio.create_task(coro)
             )
+        if output_dir != None:
+            pages_content = []
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                print("saved", result['year'], result['status'], result['size'])
+                pages_content.append(result)
+            return pages_content
         pages_content = await asyncio.gather(*tasks) # [{"body": "..", "year": 2020 }]
         return pages_content
 
 
-results = asyncio.run(main())
+if __name__ == "__main__":
+    output_dir = pathlib.Path().resolve() / "snapshots"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if "--stream" in sys.argv:
+        # python ascrape_multi.py --stream
+        asyncio.run(main(output_dir=output_dir))
+        sys.exit(0)
 
-output_dir = pathlib.Path().resolve() / "snapshots"
-output_dir.mkdir(parents=True, exist_ok=True)
+    results = asyncio.run(main())
 
-for result in results:
-    current_year = result.get("year")
-    html_data = result.get('body')
-    output_file = output_dir / f"{current_year}.html"
-    output_file.write_text(html_data.decode())
-    # with open('path/to/output', 'w') as f:
-    #     f.write(html_data.decode())
\ No newline at end of file
+    for result in results:
+        current_year = result.get("year")
+        html_data = result.get('body')
+        output_file = output_dir / f"{current_year}.html"
+        output_file.write_text(html_data.decode())
+        # with open('path/to/output', 'w') as f:
+        #     f.write(html_data.decode())
\ No newline at end of file
@@ -1,21 +1,42 @@
+import sys
 import asyncio
 from aiohttp import ClientSession
 import pathlib
 
+from limiter import AdaptiveLimiter
+from stream import fetch_to_file
+
 async def fetch(url, session, year=None):
     async with session.get(url) as response:
         html_body = await response.read()
-        return {"body": html_body, "year": year}
+        return {"body": html_body, "year": year, "status": response.status}
+
+def fetch_or_stream(url, session, year=None, output_dir=None):
+    if output_dir != None:
+        return fetch_to_file(url, session, output_dir, year=year)
+    return fetch(url, session, year)
 
-async def fetch_with_sem(sem, session, url, year=None):
+async def fetch_with_sem(sem, session, url, year=None, output_dir=None):
+    # sem: an asyncio.Semaphore or a limiter.AdaptiveLimiter
+    # output_dir: stream the body to output_dir/{year}.html instead of returning it
+    if isinstance(sem, AdaptiveLimiter):
+        async with sem.slot(url) as slot:
+            result = await fetch_or_stream(url, session, year, output_dir=output_dir)
+            slot.status = result['status']
+            return result
     async with sem:
-        return await fetch(url, session, year)
+        return await fetch_or_stream(url, session, year, output_dir=output_dir)
 
-async def main(start_year=2020, years_ago=20):
+async def main(start_year=2020, years_ago=20, output_dir=None):
+    """
+    With output_dir each page is written to disk as soon as it
+    arrives and the results only hold {"year", "status", "path", "size"}.
+    """
     html_body = ""
     tasks = []
     # semaphore
-    sem = asyncio.Semaphore(10)
+    # grows while the site keeps up, backs off on errors / 429s / slowdowns
+    sem = AdaptiveLimiter(initial=4, max_limit=50)
     async with ClientSession() as session:
         for i in range(0, years_ago):
             year = start_year - i
@@ -23,22 +44,36 @@ async def main(start_year=2020, years_ago=20):
             print("year", year, url)
             tasks.append(
                 asyncio.create_task(
-                    fetch_with_sem(sem, session, url, year=year)
+                    fetch_with_sem(sem, session, url, year=year, output_dir=output_dir)
                 )
             )
-        pages_content = await asyncio.gather(*tasks) # [{"body": "..", "year": 2020 }]
+        if output_dir != None:
+            pages_content = []
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                print("saved", result['year'], result['status'], result['size'])
+                pages_content.append(result)
+        else:
+            pages_content = await asyncio.gather(*tasks) # [{"body": "..", "year": 2020 }]
+        sem.print_metrics()
         return pages_content
 
 
-results = asyncio.run(main())
+if __name__ == "__main__":
+    output_dir = pathlib.Path().resolve() / "snapshots"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if "--stream" in sys.argv:
+        # python ascrape_sema.py --stream
+        asyncio.run(main(output_dir=output_dir))
+        sys.exit(0)
 
-output_dir = pathlib.Path().resolve() / "snapshots"
-output_dir.mkdir(parents=True, exist_ok=True)
+    results = asyncio.run(main())
 
-for result in results:
-    current_year = result.get("year")
-    html_data = result.get('body')
-    output_file = output_dir / f"{current_year}.html"
-    output_file.write_text(html_data.decode())
-    # with open('path/to/output', 'w') as f:
-    #     f.write(html_data.decode())
\ No newline at end of file
+    for result in results:
+        current_year = result.get("year")
+        html_data = result.get('body')
+        output_file = output_dir / f"{current_year}.html"
+        output_file.write_text(html_data.decode())
+        # with open('path/to/output', 'w') as f:
+        #     f.write(html_data.decode())
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Benchmark the Day 27 scraping strategies against local_server.py.
+
+- sync:      one requests.Session, one page after another
+- gather:    ascrape_multi.fetch, every page at once
+- semaphore: ascrape_sema.fetch_with_sem at each --levels concurrency
+- adaptive:  ascrape_sema.fetch_with_sem with a limiter.AdaptiveLimiter
+             (--levels is its max limit)
+
+python benchmark.py --requests 100 --latency 100 --levels 1 5 10 25 50
+"""
+import sys
+import time
+import socket
+import asyncio
+import inspect
+import argparse
+import subprocess
+import statistics
+import requests
+from aiohttp import ClientSession
+
+import ascrape_multi
+import ascrape_sema
+from limiter import AdaptiveLimiter
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if len(values) == 0:
+        return 0
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, latency, jitter, payload_size, error_rate=0.0):
+    cmd = [
+        sys.executable, "local_server.py",
+        "--port", str(port),
+        "--latency", str(latency),
+        "--jitter", str(jitter),
+        "--error-rate", str(error_rate),
+    ]
+    if payload_size != None:
+        cmd += ["--payload-size", str(payload_size)]
+    proc = subprocess.Popen(cmd, cwd=sys.path[0] or ".")
+    for _ in range(100):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("local_server.py did not start")
+
+
+def year_urls(base_url, count):
+    return [(f"{base_url}/year/{2020 - i}/", 2020 - i) for i in range(count)]
+
+
+def run_sync(urls, concurrency=1):
+    latencies = []
+    with requests.Session() as session:
+        for url, year in urls:
+            start_time = time.perf_counter()
+            session.get(url).content
+            latencies.append(time.perf_counter() - start_time)
+    return latencies
+
+
+async def timed(coro):
+    start_time = time.perf_counter()
+    await coro
+    return time.perf_counter() - start_time
+
+
+async def run_gather(urls, concurrency=None):
+    async with ClientSession() as session:
+        tasks = [
+            asyncio.create_task(timed(ascrape_multi.fetch(url, session, year)))
+            for url, year in urls
+        ]
+        return await asyncio.gather(*tasks)
+
+
+async def run_semaphore(urls, concurrency=10):
+    sem = asyncio.Semaphore(concurrency)
+    async with ClientSession() as session:
+        tasks = [
+            asyncio.create_task(timed(ascrape_sema.fetch_with_sem(sem, session, url, year=year)))
+            for url, year in urls
+        ]
+        return await asyncio.gather(*tasks)
+
+
+async def run_adaptive(urls, concurrency=10):
+    limiter = AdaptiveLimiter(initial=min(4, concurrency), max_limit=concurrency)
+    async with ClientSession() as session:
+        tasks = [
+            asyncio.create_task(timed(ascrape_sema.fetch_with_sem(limiter, session, url, year=year)))
+            for url, year in urls
+        ]
+        latencies = await asyncio.gather(*tasks)
+    limiter.print_metrics()
+    return latencies
+
+
+STRATEGIES = {
+    "sync": run_sync,
+    "gather": run_gather,
+    "semaphore": run_semaphore,
+    "adaptive": run_adaptive,
+}
+
+
+def measure(strategy, urls, concurrency):
+    runner = STRATEGIES[strategy]
+    start_time = time.perf_counter()
+    if inspect.iscoroutinefunction(runner):
+        latencies = asyncio.run(runner(urls, concurrency=concurrency))
+    else:
+        latencies = runner(urls, concurrency=concurrency)
+    run_time = time.perf_counter() - start_time
+    return {
+        "strategy": strategy,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": run_time,
+        "throughput": len(latencies) / run_time,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+    }
+
+
+def print_report(results):
+    print(f"{'strategy':<11}{'conc':>6}{'reqs':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['strategy']:<11}{r['concurrency']:>6}{r['requests']:>6}{r['throughput']:>10.1f}"
+              f"{r['p50'] * 1000:>10.1f}{r['p95'] * 1000:>10.1f}{r['p99'] * 1000:>10.1f}")
+
+
+def run(total=100, levels=(1, 5, 10, 25, 50), latency=100, jitter=0, payload_size=None, strategies=None, error_rate=0.0):
+    strategies = strategies or list(STRATEGIES)
+    port = free_port()
+    server = start_server(port, latency, jitter, payload_size, error_rate=error_rate)
+    try:
+        urls = year_urls(f"http://127.0.0.1:{port}", total)
+        results = []
+        for strategy in strategies:
+            if strategy == "sync":
+                results.append(measure(strategy, urls, 1))
+            elif strategy == "gather":
+                results.append(measure(strategy, urls, total))
+            else:
+                for level in levels:
+                    results.append(measure(strategy, urls, level))
+        print_report(results)
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--latency", type=float, default=100, help="ms per response")
+    parser.add_argument("--jitter", type=float, default=0, help="ms")
+    parser.add_argument("--payload-size", type=int, default=None, help="bytes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=None)
+    args = parser.parse_args()
+    run(
+        total=args.requests,
+        levels=args.levels,
+        latency=args.latency,
+        jitter=args.jitter,
+        payload_size=args.payload_size,
+        strategies=args.strategies,
+        error_rate=args.error_rate,
+    )
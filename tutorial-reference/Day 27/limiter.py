@@ -0,0 +1,145 @@
+"""
+Adaptive per-host concurrency limit (AIMD, like TCP congestion control).
+
+- starts in slow start: every healthy response adds 1 to the limit
+  (it doubles each round of requests) until the first back off
+- after that every healthy response adds ~1 per "round" of requests
+- an error, a 429 / 5xx, or latency rising well above the best
+  latency seen so far cuts the limit
+
+limiter = AdaptiveLimiter(initial=4, max_limit=50)
+async with limiter.slot(url) as slot:
+    response = ...
+    slot.status = response.status
+"""
+import time
+import asyncio
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    def __init__(self, host, initial=4, min_limit=1, max_limit=64,
+                 backoff=0.5, latency_tolerance=2.0, smoothing=0.2):
+        self.host = host
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.condition = asyncio.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.latency = None # smoothed (EWMA) latency
+        self.best_latency = None
+        self.last_decrease = 0
+        self.slow_start = True
+        # metrics
+        self.requests = 0
+        self.errors = 0
+        self.queue_delay_total = 0
+        self.queue_delay_max = 0
+
+    async def acquire(self):
+        queue_start = time.monotonic()
+        self.queued += 1
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        self.queued -= 1
+        queue_delay = time.monotonic() - queue_start
+        self.queue_delay_total += queue_delay
+        self.queue_delay_max = max(self.queue_delay_max, queue_delay)
+
+    async def release(self, latency, failed=False):
+        self.requests += 1
+        if failed:
+            self.errors += 1
+            self.decrease()
+        else:
+            self.observe(latency)
+            if self.latency > self.best_latency * self.latency_tolerance:
+                self.decrease()
+            elif self.slow_start:
+                self.limit = min(self.max_limit, self.limit + 1)
+            else:
+                # additive increase: about +1 once `limit` requests succeed
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def observe(self, latency):
+        if self.latency == None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        if self.best_latency == None or self.latency < self.best_latency:
+            self.best_latency = self.latency
+
+    def decrease(self):
+        # one cut per round trip, a burst of failures from the
+        # same window shouldn't collapse the limit to the floor
+        now = time.monotonic()
+        if self.latency != None and now - self.last_decrease < self.latency:
+            return
+        self.last_decrease = now
+        self.slow_start = False
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def metrics(self):
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": (self.latency or 0) * 1000,
+            "queue_delay_avg_ms": self.queue_delay_total / max(1, self.requests) * 1000,
+            "queue_delay_max_ms": self.queue_delay_max * 1000,
+        }
+
+
+class Slot:
+    """
+    One request's hold on its host's limit. Set `status` to the
+    response status so 429s / 5xx count as failures.
+    """
+    def __init__(self, host_limiter):
+        self.host_limiter = host_limiter
+        self.status = None
+        self.start_time = None
+
+    async def __aenter__(self):
+        await self.host_limiter.acquire()
+        self.start_time = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        latency = time.monotonic() - self.start_time
+        failed = exc_type != None or self.status == 429 or (self.status or 0) >= 500
+        await self.host_limiter.release(latency, failed=failed)
+        return False
+
+
+class AdaptiveLimiter:
+    def __init__(self, **host_kwargs):
+        self.host_kwargs = host_kwargs
+        self.hosts = {}
+
+    def for_host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(host, **self.host_kwargs)
+        return self.hosts[host]
+
+    def slot(self, url):
+        return Slot(self.for_host(urlparse(url).netloc))
+
+    def metrics(self):
+        return {host: limiter.metrics() for host, limiter in self.hosts.items()}
+
+    def print_metrics(self):
+        for host, m in self.metrics().items():
+            print(f"{host}: limit={m['limit']} in_flight={m['in_flight']} queued={m['queued']} "
+                  f"requests={m['requests']} errors={m['errors']} latency={m['latency_ms']:.1f}ms "
+                  f"queue_delay avg={m['queue_delay_avg_ms']:.1f}ms max={m['queue_delay_max_ms']:.1f}ms")
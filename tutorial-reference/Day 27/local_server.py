@@ -0,0 +1,63 @@
+"""
+Local stand-in for boxofficemojo so the scrapers can be
+benchmarked without hitting the live site.
+
+Serves Day 12/world.html (or --page) for /year/{year}/ and
+/year/world/{year}/ after --latency ms (+/- --jitter ms).
+--payload-size pads or trims the page to that many bytes.
+--error-rate answers that fraction of requests with a 429.
+
+python local_server.py --port 8080 --latency 100 --jitter 20
+"""
+import random
+import asyncio
+import pathlib
+import argparse
+from aiohttp import web
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent
+DEFAULT_PAGE = BASE_DIR.parent / "Day 12" / "world.html"
+
+
+def load_payload(page=DEFAULT_PAGE, payload_size=None):
+    body = pathlib.Path(page).read_bytes()
+    if payload_size == None:
+        return body
+    if payload_size <= len(body):
+        return body[:payload_size]
+    padding = b"<!-- " + b"x" * (payload_size - len(body) - 9) + b" -->"
+    return body + padding[:payload_size - len(body)]
+
+
+def create_app(payload, latency=0.1, jitter=0.0, error_rate=0.0):
+    async def year_view(request):
+        delay = max(0, latency + random.uniform(-jitter, jitter))
+        await asyncio.sleep(delay)
+        if error_rate > 0 and random.random() < error_rate:
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        return web.Response(body=payload, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/year/{year}/", year_view)
+    app.router.add_get("/year/world/{year}/", year_view)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=100, help="ms")
+    parser.add_argument("--jitter", type=float, default=0, help="ms")
+    parser.add_argument("--payload-size", type=int, default=None, help="bytes")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page", default=str(DEFAULT_PAGE))
+    args = parser.parse_args()
+    payload = load_payload(args.page, args.payload_size)
+    app = create_app(
+        payload,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+    )
+    web.run_app(app, host=args.host, port=args.port, print=None)
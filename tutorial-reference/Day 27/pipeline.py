@@ -0,0 +1,183 @@
+"""
+Two-stage scrape pipeline:
+
+    async fetchers -> bounded queue -> ProcessPoolExecutor parsers -> data/{year}.csv
+
+Fetching only waits on the network so it stays on the event loop;
+parsing is CPU bound so it runs in worker processes and never blocks
+the loop. Each page is written as soon as its parse finishes.
+
+python pipeline.py --start-year 2020 --years-ago 20 --fetchers 10 --workers 4 --queue-depth 8
+"""
+import os
+import csv
+import time
+import asyncio
+import pathlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import ClientSession, ClientError
+
+from table_parser import iter_table
+
+BASE_URL = "https://www.boxofficemojo.com"
+
+
+class StageCounter:
+    """
+    Per-stage throughput: items, bytes and time spent working.
+    `busy` is summed across concurrent tasks / processes, `wall`
+    is first start to last finish.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.size = 0
+        self.busy = 0
+        self.first_start = None
+        self.last_end = None
+
+    def record(self, start_time, end_time, size=0):
+        self.items += 1
+        self.size += size
+        self.busy += end_time - start_time
+        if self.first_start == None or start_time < self.first_start:
+            self.first_start = start_time
+        if self.last_end == None or end_time > self.last_end:
+            self.last_end = end_time
+
+    @property
+    def wall(self):
+        if self.first_start == None:
+            return 0
+        return self.last_end - self.first_start
+
+    def report(self):
+        per_second = self.items / self.wall if self.wall > 0 else 0
+        avg = self.busy / self.items if self.items > 0 else 0
+        return (f"{self.name:<6}{self.items:>6} items{per_second:>10.2f}/s"
+                f"{avg * 1000:>10.1f} ms avg{self.size / 1024:>12,.0f} KiB")
+
+
+def parse_page(body):
+    """
+    Runs in a worker process: decode and extract the table.
+    """
+    start_time = time.time()
+    html_text = body.decode("utf-8", errors="replace")
+    rows = list(iter_table(html_text))
+    return rows, start_time, time.time()
+
+
+def write_rows(rows, output_file):
+    tmp_file = output_file.with_suffix(".csv.tmp")
+    with open(tmp_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(rows)
+    os.replace(tmp_file, output_file)
+
+
+async def fetcher(session, years, queue, counters, base_url=BASE_URL):
+    while True:
+        try:
+            year = years.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        url = f"{base_url}/year/{year}/"
+        start_time = time.time()
+        try:
+            async with session.get(url) as response:
+                body = await response.read()
+                status = response.status
+        except (ClientError, asyncio.TimeoutError) as e:
+            print(f"{year} failed: {e!r}")
+            continue
+        counters['fetch'].record(start_time, time.time(), size=len(body))
+        if status != 200:
+            print(f"{year} failed with {status}")
+            continue
+        wait_start = time.time()
+        # blocks here when the parsers fall behind (backpressure)
+        await queue.put((year, body))
+        counters['queue'].record(wait_start, time.time())
+
+
+async def parse_worker(queue, executor, output_dir, counters):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await queue.get()
+        if item == None:
+            queue.task_done()
+            return
+        year, body = item
+        try:
+            rows, start_time, end_time = await loop.run_in_executor(executor, parse_page, body)
+            counters['parse'].record(start_time, end_time, size=len(body))
+            if len(rows) == 0:
+                print(f"{year} has no table")
+                continue
+            start_time = time.time()
+            output_file = output_dir / f"{year}.csv"
+            write_rows(rows, output_file)
+            counters['write'].record(start_time, time.time(), size=output_file.stat().st_size)
+            print(f"Finished {year} ({len(rows) - 1} rows)")
+        except Exception as e:
+            print(f"{year} not finished: {e}")
+        finally:
+            queue.task_done()
+
+
+async def run_pipeline(years, fetchers=10, workers=None, queue_depth=None, output_dir=None, base_url=BASE_URL):
+    workers = workers or os.cpu_count() or 1
+    queue_depth = queue_depth or workers * 2
+    output_dir = pathlib.Path(output_dir or pathlib.Path().resolve() / "data")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counters = {name: StageCounter(name) for name in ("fetch", "queue", "parse", "write")}
+
+    pending_years = asyncio.Queue()
+    for year in years:
+        pending_years.put_nowait(year)
+    queue = asyncio.Queue(maxsize=queue_depth)
+
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsers = [
+            asyncio.create_task(parse_worker(queue, executor, output_dir, counters))
+            for _ in range(workers)
+        ]
+        async with ClientSession() as session:
+            await asyncio.gather(*[
+                fetcher(session, pending_years, queue, counters, base_url=base_url)
+                for _ in range(fetchers)
+            ])
+        for _ in parsers:
+            await queue.put(None)
+        await asyncio.gather(*parsers)
+    run_time = time.time() - start_time
+
+    print(f"\n{len(years)} pages in {run_time:.2f}s "
+          f"(fetchers={fetchers}, workers={workers}, queue_depth={queue_depth})")
+    for counter in counters.values():
+        print(counter.report())
+    return counters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start-year", type=int, default=2020)
+    parser.add_argument("--years-ago", type=int, default=20)
+    parser.add_argument("--fetchers", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--queue-depth", type=int, default=None)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--base-url", default=BASE_URL)
+    args = parser.parse_args()
+    years = [args.start_year - i for i in range(0, args.years_ago)]
+    asyncio.run(run_pipeline(
+        years,
+        fetchers=args.fetchers,
+        workers=args.workers,
+        queue_depth=args.queue_depth,
+        output_dir=args.output_dir,
+        base_url=args.base_url,
+    ))
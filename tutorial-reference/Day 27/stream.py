@@ -0,0 +1,31 @@
+import os
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def fetch_to_file(url, session, output_dir, year=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream the response body to output_dir/{year}.html as raw bytes,
+    `chunk_size` at a time, so only one chunk per request is held in
+    memory. The body goes to a temp file first and is renamed into
+    place, so a snapshot is never left half written.
+    Non-200 responses are not written (the old snapshot is kept).
+    """
+    output_file = output_dir / f"{year}.html"
+    tmp_file = output_dir / f".{year}.html.tmp"
+    size = 0
+    async with session.get(url) as response:
+        status = response.status
+        if status != 200:
+            return {"year": year, "status": status, "path": None, "size": 0}
+        try:
+            with open(tmp_file, 'wb') as f:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            if tmp_file.exists():
+                tmp_file.unlink()
+            raise
+    os.replace(tmp_file, output_file)
+    return {"year": year, "status": status, "path": output_file, "size": size}
@@ -0,0 +1,122 @@
+"""
+Requests/second of wsgi.py with 1, 2, 4 ... up to --max-workers
+pre-forked workers (default: the number of cores).
+
+The load comes from --clients client processes, each holding one
+keep-alive connection and sending GET requests back to back, so
+the client side isn't limited by a single GIL either. Clients and
+server share the machine: leave cores for the clients (or run the
+clients elsewhere) to see the server's own scaling.
+
+python bench_prefork.py --duration 10 --clients 8 --threads 2
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import http.client
+import multiprocessing
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__)) # /Day_28/src/
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers, threads):
+    proc = subprocess.Popen(
+        [sys.executable, "wsgi.py", "--port", str(port), "--workers", str(workers), "--threads", str(threads)],
+        cwd=SRC_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, # waitress logs "Task queue depth" under load
+    )
+    for _ in range(200):
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("wsgi.py did not start")
+
+
+def client(args):
+    port, path, start_time, duration = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    while time.time() < start_time:
+        time.sleep(0.001)
+    count = 0
+    errors = 0
+    while time.time() < start_time + duration:
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            # e.g. the worker holding this connection was recycled
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            continue
+        count += 1
+    conn.close()
+    return count, errors
+
+
+def measure(port, clients, duration, path):
+    # every client starts at the same wall clock time
+    start_time = time.time() + 0.5
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, [(port, path, start_time, duration)] * clients)
+    requests = sum(count for count, _ in results)
+    errors = sum(errors for _, errors in results)
+    return requests / duration, errors
+
+
+def worker_counts(max_workers):
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run(max_workers=None, threads=2, clients=8, duration=10, path="/"):
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"{os.cpu_count()} cores, {clients} client processes, {threads} threads per worker, GET {path}")
+    print(f"{'workers':>8}{'req/s':>12}{'vs 1':>8}{'errors':>8}")
+    baseline = None
+    for workers in worker_counts(max_workers):
+        port = free_port()
+        proc = start_server(port, workers, threads)
+        try:
+            requests_per_second, errors = measure(port, clients, duration, path)
+        finally:
+            proc.terminate()
+            proc.wait()
+        baseline = baseline or requests_per_second
+        print(f"{workers:>8}{requests_per_second:>12,.0f}{requests_per_second / baseline:>7.2f}x{errors:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+    run(max_workers=args.max_workers, threads=args.threads, clients=args.clients,
+        duration=args.duration, path=args.path)
@@ -1 +1,50 @@
-from .main import *
\ No newline at end of file
+"""
+Nothing is imported until it is used: `import cfe_os` is instant and
+Flask (the bulk of the start up time) is only imported when the app
+is first accessed, e.g. `from cfe_os import web_app`.
+
+PEP 562's module __getattr__ needs Python 3.7, the frozen builds
+use 3.6, so the package module's class is swapped instead (3.5+).
+"""
+import sys
+import types
+
+
+def _main():
+    from . import main
+    return main
+
+
+def _resources():
+    from . import resources
+    return resources
+
+
+# name -> loader, run once on first access
+_LAZY_ATTRIBUTES = {
+    "web_app": lambda: _main().web_app,
+    "index": lambda: _main().index,
+    "BASE_DIR": lambda: _main().BASE_DIR,
+    "DATA_DIR": lambda: _resources().get_resource_path("data"),
+    "IMG_PATH": lambda: _resources().get_resource_path("data") / "beach.jpg",
+    "get_resource_path": lambda: _resources().get_resource_path,
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+class _LazyPackage(types.ModuleType):
+    def __getattr__(self, name):
+        # only called when `name` isn't set on the module yet
+        load = _LAZY_ATTRIBUTES.get(name)
+        if load == None:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        value = load()
+        setattr(self, name, value) # later lookups are plain attribute hits
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_LAZY_ATTRIBUTES))
+
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -1,16 +1,21 @@
+import os
 import pathlib
 from flask import Flask
 
-from .resources import get_resource_path
+from .caching_middleware import CachingMiddleware
+from .metrics_middleware import MetricsMiddleware
+from .resources import get_resource_path, resource_exists
 BASE_DIR = pathlib.Path(__file__).resolve().parent
-DATA_DIR = get_resource_path("data")
-IMG_PATH = DATA_DIR / 'beach.jpg'
 web_app = Flask(__name__)
+# ETag / 304 and gzip
+web_app.wsgi_app = CachingMiddleware(web_app.wsgi_app)
+# /metrics, PROFILE_REQUESTS=1 to sample stacks of the slowest requests
+web_app.wsgi_app = MetricsMiddleware(web_app.wsgi_app, url_map=web_app.url_map, profile=os.environ.get("PROFILE_REQUESTS") == "1")
 
 @web_app.route("/", methods=['GET']) #http://localhost:5000/
 def index():
     return {"dir": str(BASE_DIR), 
-    'data_dir': str(DATA_DIR),
-    'IMG_PATH': IMG_PATH.exists()
+    'data_dir': str(get_resource_path("data")),
+    'IMG_PATH': resource_exists("data/beach.jpg")
     }, 200
 
@@ -1,14 +1,42 @@
+import os
 import pathlib
 import sys
+from functools import lru_cache
 
 
+@lru_cache(maxsize=None)
+def get_base_path():
+    # sys._MEIPASS: where a frozen (pyinstaller) build unpacks its data
+    dev_base_path = pathlib.Path(__file__).resolve().parent.parent
+    return pathlib.Path(getattr(sys, "_MEIPASS", dev_base_path))
+
+
+@lru_cache(maxsize=None)
 def get_resource_path(relative_path):
     """
     relative_path = "data/beach.jpg"
     relative_path = pathlib.Path("data") / "beach.jpg"
     relative_path = os.path.join("data", "beach.jpg")
+
+    Resolved once per relative_path, then served from the cache.
     """
     rel_path = pathlib.Path(relative_path)
-    dev_base_path = pathlib.Path(__file__).resolve().parent.parent
-    base_path = getattr(sys, "_MEIPASS", dev_base_path)
-    return base_path / rel_path
\ No newline at end of file
+    return get_base_path() / rel_path
+
+
+@lru_cache(maxsize=None)
+def list_resources(relative_dir="."):
+    """
+    The resource index: the file names in a bundled directory,
+    listed once. Bundled files don't change while the app runs.
+    """
+    try:
+        with os.scandir(get_resource_path(relative_dir)) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def resource_exists(relative_path):
+    rel_path = pathlib.PurePath(relative_path)
+    return rel_path.name in list_resources(str(rel_path.parent))
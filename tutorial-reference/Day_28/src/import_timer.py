@@ -0,0 +1,150 @@
+"""
+Start up time report: how long each module takes to import.
+
+Like `python -X importtime`, but as a sys.meta_path hook, so it
+also works in the frozen (pyinstaller) builds where there are no
+interpreter flags. Install it before anything else is imported:
+
+    CFE_OS_IMPORT_REPORT=1 ./cfe-os-mac
+    python wsgi.py --startup-report
+
+self: time spent in the module's own code
+cumulative: self + every module it imported for the first time
+"""
+import os
+import sys
+import time
+
+STARTED = time.perf_counter() # as close to interpreter start as we get
+ENV_VAR = "CFE_OS_IMPORT_REPORT"
+
+
+def process_age():
+    """
+    Seconds since the process was created (Linux only, else None).
+    Includes what happens before Python runs, like a onefile
+    build unpacking itself.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+class TimingLoader:
+    """
+    Wraps a module's loader while it is created and executed,
+    then puts the real loader back on the module.
+    """
+    def __init__(self, loader, timer):
+        self.loader = loader
+        self.timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        # extension modules do their work here
+        self.timer.start(spec.name)
+        try:
+            return self.loader.create_module(spec)
+        finally:
+            self.timer.stop()
+
+    def exec_module(self, module):
+        self.timer.start(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.stop()
+            spec = getattr(module, "__spec__", None)
+            if spec != None and spec.loader is self:
+                spec.loader = self.loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self.loader
+
+
+class ImportTimer:
+    def __init__(self):
+        self.stack = [] # [name, start time, time spent in child imports]
+        self.modules = {} # name -> [self seconds, cumulative seconds]
+
+    def find_spec(self, fullname, path=None, target=None):
+        # ask the other finders (incl. pyinstaller's) and wrap what they find
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec != None:
+                break
+        else:
+            return None
+        if spec.loader == None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = TimingLoader(spec.loader, self)
+        return spec
+
+    def start(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        name, start_time, children = self.stack.pop()
+        elapsed = time.perf_counter() - start_time
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        if name not in self.modules:
+            self.modules[name] = [0.0, 0.0]
+        self.modules[name][0] += elapsed - children
+        self.modules[name][1] += elapsed
+
+    def report(self, top=15):
+        by_package = {}
+        for name, (self_time, _) in self.modules.items():
+            package = name.split(".")[0]
+            by_package[package] = by_package.get(package, 0) + self_time
+        lines = [f"{len(self.modules)} modules imported in {sum(by_package.values()) * 1000:.1f} ms"]
+        lines.append(f"{'package':<40}{'self ms':>10}")
+        for package, self_time in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"{package:<40}{self_time * 1000:>10.1f}")
+        lines.append(f"{'module':<40}{'self ms':>10}{'cumulative ms':>15}")
+        slowest = sorted(self.modules.items(), key=lambda item: -item[1][0])[:top]
+        for name, (self_time, cumulative) in slowest:
+            lines.append(f"{name:<40}{self_time * 1000:>10.1f}{cumulative * 1000:>15.1f}")
+        return "\n".join(lines)
+
+
+timer = None
+
+
+def install():
+    global timer
+    if timer == None:
+        timer = ImportTimer()
+        sys.meta_path.insert(0, timer)
+    return timer
+
+
+def install_from_env():
+    if os.environ.get(ENV_VAR) == "1":
+        return install()
+    return None
+
+
+def startup_report(first_request_at=None, top=15):
+    """
+    The import breakdown plus time to ready / first request,
+    measured from the earliest point available.
+    """
+    lines = [] if timer == None else [timer.report(top=top)]
+    now = time.perf_counter()
+    age = process_age()
+    if age != None:
+        lines.append(f"process start -> now: {age * 1000:.1f} ms")
+    lines.append(f"python start -> now: {(now - STARTED) * 1000:.1f} ms")
+    if first_request_at != None:
+        lines.append(f"python start -> first response: {(first_request_at - STARTED) * 1000:.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,267 @@
+"""
+Pre-forking launcher for waitress.
+
+The master binds the listening socket once and forks `workers`
+processes. Every worker runs its own waitress server (with `threads`
+threads) on that same socket and the kernel hands each new connection
+to one of them, so throughput scales with cores instead of being
+capped by one process' GIL.
+
+- SIGHUP: graceful restart. New workers are started (loading the app
+  again, so code changes are picked up), then the old ones are
+  told to finish their in-flight requests and exit.
+- SIGTERM / SIGINT: graceful stop.
+- max_requests: a worker exits after about that many requests and is
+  replaced (max_requests_jitter spreads the restarts out), which caps
+  slow leaks in long running processes.
+
+Each worker has its own memory, so e.g. /metrics shows one worker.
+
+Windows has no os.fork(): run() falls back to a single waitress process.
+"""
+import os
+import sys
+import time
+import random
+import signal
+import socket
+import threading
+import traceback
+
+from waitress import create_server, serve
+from waitress.channel import HTTPChannel
+
+DEFAULT_GRACEFUL_TIMEOUT = 30
+# a new connection gets this long to send its first request while draining
+FIRST_REQUEST_TIMEOUT = 1
+
+
+def can_fork():
+    return hasattr(os, "fork")
+
+
+def make_listener(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+class Drain:
+    """
+    A worker's request count and stop flag, shared by its connections.
+    """
+    def __init__(self, max_requests=0):
+        self.max_requests = max_requests
+        self.served = 0
+        self.stopping = threading.Event()
+
+    def count_request(self):
+        # only called from the server loop's thread
+        self.served += 1
+        if self.max_requests and self.served >= self.max_requests:
+            self.stopping.set()
+
+
+class DrainableChannel(HTTPChannel):
+    """
+    Counts requests as they are read, and once the worker is stopping
+    answers them with "Connection: close" so keep-alive clients
+    reconnect (to another worker) instead of reusing this connection.
+    """
+    # True once a whole request has been read on this connection
+    served = False
+
+    def received(self, data):
+        result = HTTPChannel.received(self, data)
+        drain = self.server.drain
+        for request in list(self.requests):
+            if not getattr(request, "counted", False):
+                request.counted = True
+                self.served = True
+                drain.count_request()
+        if drain.stopping.is_set():
+            self.close_after_requests()
+        return result
+
+    def close_after_requests(self):
+        for request in list(self.requests):
+            # read by waitress when it writes the response headers
+            request.headers["CONNECTION"] = "close"
+
+    def is_idle(self, now):
+        if self.requests or self.request != None:
+            # a request is running, queued or half read
+            return False
+        # a connection accepted just before draining started
+        # hasn't sent its request yet, give it a moment
+        return self.served or now - self.last_activity > FIRST_REQUEST_TIMEOUT
+
+
+def serve_worker(app, sock, threads=2, max_requests=0, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT):
+    """
+    Runs in the forked worker until it is told to stop
+    (or has served `max_requests`), then drains and returns.
+    """
+    drain = Drain(max_requests)
+    signal.signal(signal.SIGTERM, lambda signum, frame: drain.stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: drain.stopping.set())
+    # restarts are the master's job
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server = create_server(app, sockets=[sock], threads=threads)
+    server.channel_class = DrainableChannel
+    server.drain = drain
+    deadline = None
+    while True:
+        # waitress' own run(), one poll at a time so `stopping` is checked
+        server.asyncore.loop(timeout=0.5, map=server._map, use_poll=server.adj.asyncore_use_poll, count=1)
+        if not drain.stopping.is_set():
+            continue
+        if deadline == None:
+            # stop accepting, the other workers keep serving the shared socket
+            server.accepting = False
+            deadline = time.monotonic() + graceful_timeout
+        now = time.time() # waitress' last_activity clock
+        for channel in list(server.active_channels.values()):
+            if channel.is_idle(now):
+                # idle keep-alive connection, closed once its output is flushed
+                channel.will_close = True
+            else:
+                channel.close_after_requests()
+        if not server.active_channels or time.monotonic() > deadline:
+            break
+    server.task_dispatcher.shutdown(cancel_pending=True, timeout=graceful_timeout)
+
+
+class Arbiter:
+    """
+    The master process: keeps `workers` workers alive and
+    handles the restart / stop signals.
+
+    load_app is called in each worker after the fork (the app is
+    imported fresh on every restart), or once in the master before
+    forking with preload=True (faster forks, memory shared
+    copy-on-write, but a restart keeps the old code).
+    """
+    def __init__(self, load_app, host="127.0.0.1", port=5002, workers=2, threads=2,
+                 max_requests=0, max_requests_jitter=0, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT,
+                 preload=False):
+        self.load_app = load_app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.app = load_app() if preload else None
+        self.workers = {} # pid -> spawn time
+        self.sock = None
+        self.signals = []
+
+    def run(self):
+        self.sock = make_listener(self.host, self.port)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.handle_signal)
+        print(f"Serving on http://{self.host}:{self.port} with {self.num_workers} workers x {self.threads} threads (pid {os.getpid()})")
+        for _ in range(self.num_workers):
+            self.spawn()
+        try:
+            while True:
+                while self.signals:
+                    signum = self.signals.pop(0)
+                    if signum == signal.SIGHUP:
+                        self.restart()
+                    elif signum in (signal.SIGTERM, signal.SIGINT):
+                        return
+                self.reap()
+                self.maintain()
+                # signals only queue up, they are acted on here
+                time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def handle_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def spawn(self):
+        pid = os.fork()
+        if pid != 0:
+            self.workers[pid] = time.monotonic()
+            return pid
+        # worker
+        exit_code = 0
+        try:
+            for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            random.seed() # don't share the master's random state
+            app = self.app if self.app != None else self.load_app()
+            max_requests = self.max_requests
+            if max_requests and self.max_requests_jitter:
+                max_requests += random.randint(0, self.max_requests_jitter)
+            serve_worker(app, self.sock, threads=self.threads, max_requests=max_requests,
+                         graceful_timeout=self.graceful_timeout)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            spawned = self.workers.pop(pid, None)
+            if spawned != None and os.WIFEXITED(status) and os.WEXITSTATUS(status) != 0 \
+                    and time.monotonic() - spawned < 1:
+                # crashing on startup (e.g. an import error), don't fork in a tight loop
+                time.sleep(1)
+
+    def maintain(self):
+        while len(self.workers) < self.num_workers:
+            self.spawn()
+
+    def restart(self):
+        old_workers = list(self.workers)
+        for _ in range(self.num_workers):
+            self.spawn()
+        for pid in old_workers:
+            self.workers.pop(pid, None)
+            self.kill(pid, signal.SIGTERM)
+
+    def kill(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def stop(self):
+        for pid in self.workers:
+            self.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            self.kill(pid, signal.SIGKILL)
+        self.sock.close()
+
+
+def run(load_app, host="127.0.0.1", port=5002, workers=1, threads=2, max_requests=0,
+        max_requests_jitter=0, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT, preload=False):
+    if workers <= 1 or not can_fork():
+        if workers > 1:
+            print("os.fork() isn't available here, serving with a single process")
+        serve(load_app(), host=host, port=port, threads=threads)
+        return
+    Arbiter(load_app, host=host, port=port, workers=workers, threads=threads,
+            max_requests=max_requests, max_requests_jitter=max_requests_jitter,
+            graceful_timeout=graceful_timeout, preload=preload).run()
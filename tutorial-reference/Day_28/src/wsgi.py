@@ -1,11 +1,80 @@
-from cfe_os import web_app
-from waitress import serve
+import sys
+
+import import_timer
+
+# before anything else is imported, so every import is timed
+if "--startup-report" in sys.argv:
+    import_timer.install()
+else:
+    import_timer.install_from_env()
+
+import time
+import argparse
+
+import prefork
+
+
+def load_app():
+    from cfe_os import web_app
+    return web_app
+
+
+def startup_report():
+    """
+    Load the app, serve one request in-process and print where the
+    start up time went. Works the same in a pyinstaller build:
+    ./cfe-os-mac --startup-report
+    """
+    app = load_app()
+    statuses = []
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": "/",
+        "QUERY_STRING": "",
+        "SERVER_NAME": "127.0.0.1",
+        "SERVER_PORT": "5002",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": sys.stdin.buffer,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": True,
+    }
+    body = app(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b"".join(body)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    first_request_at = time.perf_counter()
+    print(f"GET / -> {statuses[0] if statuses else 'no response'}")
+    print(import_timer.startup_report(first_request_at=first_request_at))
 
 
 if __name__ == "__main__":
-    serve(
-        web_app,
-        host='127.0.0.1',
-        port=5002,
-        threads=2
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the socket, 1: no fork")
+    parser.add_argument("--threads", type=int, default=2, help="threads per worker")
+    parser.add_argument("--max-requests", type=int, default=0, help="recycle a worker after this many requests, 0: never")
+    parser.add_argument("--max-requests-jitter", type=int, default=0)
+    parser.add_argument("--preload", action="store_true", help="import the app once in the master, before forking")
+    parser.add_argument("--startup-report", action="store_true",
+                        help=f"print import times and time to first request, then exit (or set {import_timer.ENV_VAR}=1)")
+    args = parser.parse_args()
+    if args.startup_report or import_timer.timer != None:
+        startup_report()
+        sys.exit(0)
+    prefork.run(
+        load_app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        threads=args.threads,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        preload=args.preload,
+    )